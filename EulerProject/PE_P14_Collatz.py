@@ -23,12 +23,13 @@ Problem definition: https://projecteuler.net/problem=14
 
 Solutions:
   CAUTION:
-    BOTH SOLUTIONS ASSUME THAT THE COLLATZ CONJECTURE IS PROVEN.
+    ALL SOLUTIONS ASSUME THAT THE COLLATZ CONJECTURE IS PROVEN.
     HENCE, THE PROBLEM IS BOUNDED (THE LOOP ENDS UP WITH 1).
     BUT THEORITICALLY, THERE IS NO PROOF FOR THE CONJECTURE.
-    AS ITS NOT PROVEN YET, THE CODE MUST INSPECT CONVERGENCE.
-    THE CONVERGENCE CRITERIA IS NOT IMPLEMENTED IN THIS SHEET FOR SIMPLICITY.
-    HENCE, THE PROGRAM MAY FALL INTO AN INFINITE LOOP,
+    AS ITS NOT PROVEN YET, THE CODE INSPECTS CONVERGENCE (SEE CONVERGENCE CHECKS):
+      A SEQUENCE LONGER THAN THE STEP BUDGET (STEP_BUDGET) OR HAVING A CYCLE
+      RAISES CollatzConvergenceError REPORTING THE STARTING NUMBERS.
+    HENCE, THE PROGRAM DOES NOT FALL INTO AN INFINITE LOOP,
     IF THERE EXIST EXCEPTIONAL NUMBERS FOR THE CONJECTURE (A DISPROVE).
 
   Solution 1 (Brute force solution):
@@ -37,7 +38,7 @@ Solutions:
       For each number in the loop, determine the sequence ending with 1
       Determine the max length of the sequences
 
-      The sequence is determined with a recursive function
+      The sequence is determined with the function of Solution 2
 
     Time complexity:
       Sequence determination will run for each cycle of the loop.
@@ -53,30 +54,212 @@ Solutions:
 
   Solution 2 (Single visit solution):
     Description:
-      During the calculations, store two values for each number:
-        The number of the values visitted till the current number,
-        The number of the values remaining to 1.
+      During the calculations, store the number of the values remaining to 1
+      for each visitted number.
 
-      For each new value, inspect if any value stored for the number of the visitted numbers:
-        If a value stored:
-          If the new value is higher than the stored,
-          set the new value and continue for the remaining numbers to 1.
-          Otherwise, continue with the new cycle.
+      For each new value, inspect if the number of the remaining values is stored:
+        If stored, the length of the sequence is determined without walking further.
+        Otherwise, continue with the next value.
+      After the walk, store the number of the remaining values
+      for all the values walked.
 
       With this method, each number is visitted only once.
-      The sequence is determined with a recursive function.
+      The sequence is determined with an iterative function
+      keeping the walked values in a path stack.
+      Hence, the length of the sequence is not limited by the recursion limit.
 
     Time complexity:
       Cannot be determined (see time complexity for Solution1).
 
     Space complexity:
-      No limitation for the space complexity as there is no upper bound for the problem.
-      Hence, the code may fail due to the memory problems.
+      The numbers lower than the input max number are stored in an array (array store)
+      allocated on first use (see ARRAY_BOUND_MAX for the limitation).
+      The lengths are stored as uint16 (2 bytes per number).
+      The higher numbers are stored in a bounded hash table (hash store)
+      which evicts the old entries when full (see HASH_STORE_SIZE_BITS).
+      Hence, the memory is O(N) with a constant for the hash store.
+
+  Solution 3 (Batch solution):
+    Description:
+      Split the numbers from 3 to the input max number into blocks.
+      Push all numbers of a block through the Collatz map in lockstep
+      using NumPy arrays (one lane per number).
+
+      After each step, retire the lanes which reached 1
+      or a value whose remaining length is already stored in the array store
+      (see Solution 2).
+      The blocks are processed in increasing order
+      so that the lanes of a block mostly drop into the values of the previous blocks.
+      The lengths of the block are stored in the array store before the next block.
+
+      The lanes are np.uint64 and each lane is checked for overflow.
+      The sequence of a lane which would overflow is continued
+      with the python integers (arbitrary precision) as in Solution 2.
+      Hence, the lengths are exact for any number.
+
+    Time complexity:
+      Cannot be determined (see time complexity for Solution1).
+      The number of steps is similar to Solution 2,
+      but the steps are executed by NumPy instead of the python interpreter.
+
+    Space complexity:
+      The array store of Solution 2 and O(B) for the lanes
+      where B is the block size (BATCH_SIZE).
+
+  Solution 4 (Multi-process solution):
+    Description:
+      Split the numbers from 3 to the input max number into shards.
+      Run Solution 2 for the shards in a pool of worker processes.
+      The array store of Solution 2 is placed into a shared memory block
+      so that all workers read and write a single array store.
+      The hash store is kept per worker process.
+      The max of the shard maxima is the result.
+      The lookup counters (MEMO_STATS) of the shards are summed
+      into the counters of the parent process.
+
+      The workers may race on an entry of the array store,
+      but all workers write the same value for a number.
+      Hence, the races cause only repeated work but not wrong results.
+
+    Time complexity:
+      Cannot be determined (see time complexity for Solution1).
+      The work of Solution 2 is shared by the worker processes.
+
+    Space complexity:
+      The array store of Solution 2 shared by the workers
+      and a hash store per worker process.
+
+  Solution 5 (Persistent solution):
+    Description:
+      The lengths of the numbers do not change between the runs.
+      Hence, the array store is kept in a file mapped into the memory (np.memmap).
+      The file has a header recording the upper bound covered by the file.
+
+      If the input max number is covered by the file,
+      the longest sequence is determined directly from the mapped lengths.
+      Otherwise, the file is extended and only the numbers
+      between the covered bound and the input max number are computed
+      (see Solution 3).
+      The mapped file replaces the array store only during the run:
+      The previous array store is restored on exit.
+
+    Time complexity:
+      O(N) for a covered input max number (a scan of the mapped lengths).
+      Otherwise, see Solution 3 for the numbers not covered.
+
+    Space complexity:
+      The file contains 2 bytes per number.
+      The memory is paged in by the operating system on demand.
+
+  Solution 6 (Inverse tree solution):
+    Description:
+      Grow the Collatz tree backwards from 1 level by level (breadth first)
+      using NumPy arrays for the levels.
+      The predecessors of a number m are 2m and (m - 1)/3 (if an odd integer).
+      The level of a number is the length of its sequence.
+      Hence, the lengths are assigned without walking the same sequences again.
+
+      The numbers higher than a ceiling are not generated
+      (TREE_CEILING_FACTOR times the input max number by default).
+      The numbers whose sequences exceed the ceiling are not reached by the tree.
+      These numbers are walked forward as in Solution 3.
+
+      The levels also list all numbers with a requested sequence length
+      (see generate_levels).
+
+    Time complexity:
+      O(C) where C is the ceiling
+      plus the forward walks of the numbers not reached.
+
+    Space complexity:
+      The array store of Solution 2 and O(C) for the largest level.
+
+  Solution 7 (Records only solution):
+    Description:
+      Most of the numbers cannot have the longest sequence
+      as a number with a sequence not shorter exists (dominated numbers):
+        n with 2n < N: 2n has a longer sequence,
+        n = 2 (mod 3): the lower number (2n - 1)/3 reaches n in 2 steps,
+        n = 4 (mod 6): the lower number (n - 1)/3 reaches n in 1 step,
+        n = q * 2^k + r2: merges with the lower q * 2^k + r1 after the same steps
+          for some residues r1 < r2 (see init_records_residue_mask).
+      The dominated numbers are sieved and only the others are evaluated
+      in the lanes of Solution 3.
+      As the evaluated numbers are sparse, the lanes jump (see Jump tables)
+      until the numbers stored densely (RECORDS_DENSE_BOUND).
+
+      Optionally, the record holders (the numbers with a sequence longer than
+      all lower numbers) are listed.
+      A record holder cannot be dominated by a lower number.
+      Hence, the sieve excluding the 1st rule is applied for the record holders.
+
+    Time complexity:
+      Cannot be determined (see time complexity for Solution1).
+      About 7.5% of the numbers are evaluated (15% of the upper half).
+
+    Space complexity:
+      O(RECORDS_DENSE_BOUND) for the dense numbers and O(B) for the lanes.
+
+Convergence checks:
+  The scalar walker (Solution 2) compares each value with a checkpoint
+  refreshed when the number of the steps passes a power of 2 (Brent's algorithm)
+  and inspects the step budget when the checkpoint is refreshed.
+  The lockstep lanes (Solution 3) are inspected every CHECK_INTERVAL iterations
+  against the step budget and the per lane checkpoints.
+  The step budget is inspected for the retired lanes as well.
+  Hence, the checks cost a comparison per step (scalar)
+  or per CHECK_INTERVAL iterations (lanes).
+
+Jump tables:
+  The parities of the next k steps of the shortcut map (n -> (3n + 1)/2 for odd n)
+  are determined by the low k bits of n.
+  Hence, k steps can be applied by a single lookup of an affine map
+  precomputed for the low k bits (k = JUMP_BITS).
+  Solution 2 and Solution 3 jump over the numbers higher than the array upper bound
+  (i.e. the numbers which cannot be found in the array store).
+  A jump is not applied to the numbers lower than 2^k
+  as the sequence may reach 1 during the jump.
+
+Range queries:
+  CollatzIndex is built once over an upper bound
+  and answers the queries without scanning the numbers again:
+    The length of the sequence of a number,
+    The longest sequence in a range of numbers,
+    The k longest sequences in a range of numbers.
+  The lengths are determined by Solution 3 and
+  a segment tree stores the number with the longest sequence per node.
+
+Trajectory tree:
+  CollatzTree stores the sequences of the numbers lower than a bound as a tree
+  rooted at 1 where the parent of a number is its next value.
+  The parents are stored in an array for the numbers lower than the bound
+  and for the higher numbers reached by the sequences (the overflow).
+  The sequences are streamed by following the parents
+  and the merge point of two sequences is found by binary lifting.
+  The binary lifting stores an ancestor array (np.int32) per level:
+  About 4 * V * log2(L) bytes for V nodes and the longest sequence length L
+  (e.g. about 80 MB for the bound 1e6 and about 1 GB for the bound 1e7).
+
+Sequence metrics:
+  Besides the length, the following metrics of the sequences are determined
+  in the same pass (see compute_metrics):
+    The max value reached,
+    The glide (the number of the steps to the 1st value lower than the number),
+    The number of the odd steps.
+  The metrics are stored in a structured array (METRICS) parallel to SEQUENCE1.
+  get_metrics returns the metrics of a range of numbers
+  and find_metric_max returns the number with the max metric in a range.
 
 @author: baris.albayrak.ieee@gmail.com
 """
 
+import heapq
+import multiprocessing
+from multiprocessing import shared_memory
 import numpy as np
+import os
+import struct
+import tempfile
 import time
 
 def find_next_val(val):
@@ -91,9 +274,160 @@ def find_next_val(val):
   Outputs:
     int: The next number in the sequence
   '''
-  if val % 2:
+  if val & 1:
     return 3 * val + 1
-  return int(val / 2)
+  return val >> 1
+
+
+
+
+
+'''
+*******************************************
+CONVERGENCE CHECKS
+*******************************************
+'''
+
+STEP_BUDGET = 1 << 20 # The max number of the steps walked for a sequence (the stored lengths are not walked)
+CHECK_INTERVAL = 64 # The number of the lockstep iterations between two checks of the lanes
+
+class CollatzConvergenceError(RuntimeError):
+  '''
+  Description:
+    Raised when the sequences of some numbers do not reach 1
+    within the step budget or fall into a cycle.
+
+  Attributes:
+    starts : list[int]:
+      The numbers whose sequences do not converge
+    reason : str:
+      'step budget' or 'cycle'
+  '''
+  def __init__(self, starts, reason):
+    super().__init__(starts, reason)
+    self.starts = starts
+    self.reason = reason
+
+  def __str__(self):
+    return 'Sequence does not converge ({}) for: {}'.format(
+      self.reason, ', '.join(str(start) for start in self.starts[:10]) +
+      (', ...' if len(self.starts) > 10 else ''))
+
+def inspect_lanes(starts, lanes, vals, steps, checkpoints, check_count):
+  '''
+  Description:
+    The convergence check of the lockstep lanes (see Solution 3)
+    applied every CHECK_INTERVAL iterations.
+    A lane fails if:
+      Its number of the steps exceeds the step budget, or
+      Its value equals to its checkpoint (i.e. the sequence has a cycle).
+    The checkpoints are refreshed with the current values
+    when the number of the checks is a power of 2 (Brent's algorithm).
+    Hence, a cycle is detected once the checkpoint enters the cycle and
+    the checkpoint interval exceeds the cycle length.
+
+  Parameters:
+    starts : np.ndarray:
+      The numbers for which the sequences are determined
+    lanes : np.ndarray:
+      The indices of the active lanes in the input numbers
+    vals : np.ndarray:
+      The current values of the active lanes
+    steps : np.ndarray:
+      The number of the steps of the active lanes
+    checkpoints : np.ndarray:
+      The checkpoint values indexed by the lanes (parallel to starts):
+        Refreshed in place
+    check_count : int:
+      The number of the checks including this one
+
+  Outputs:
+    void
+  '''
+  over_budget = steps > STEP_BUDGET
+  if over_budget.any():
+    raise CollatzConvergenceError(
+      starts[lanes[over_budget]].tolist(), 'step budget')
+
+  cycles = vals == checkpoints[lanes]
+  if cycles.any():
+    raise CollatzConvergenceError(starts[lanes[cycles]].tolist(), 'cycle')
+
+  if check_count & (check_count - 1) == 0:
+    checkpoints[lanes] = vals
+
+
+
+
+'''
+*******************************************
+JUMP TABLES
+*******************************************
+'''
+
+JUMP_BITS = 16 # The number of the steps advanced by a jump
+JUMP_MASK = (1 << JUMP_BITS) - 1
+JUMP_MULTIPLIERS = None # 3 ** (the number of the odd steps) indexed by the low bits
+JUMP_ADDENDS = None # The value reached by the low bits after the jump
+JUMP_STEPS = None # The number of the steps of the sequence covered by the jump
+JUMP_QUOTIENT_BOUNDS = None # The max high bits (n >> JUMP_BITS) of a jump fitting np.uint64
+
+def init_jump_tables():
+  '''
+  Description:
+    Build the jump tables on first use.
+
+    Consider the shortcut map combining an odd step with the following even step:
+      n -> n/2 (n is even)
+      n -> (3n + 1)/2 (n is odd)
+    The parities of the first JUMP_BITS shortcut steps are determined by
+    the low JUMP_BITS bits of n. Hence, for n = q * 2^k + r with k = JUMP_BITS:
+      The value after k shortcut steps is: 3^c * q + d(r)
+      The number of the steps of the sequence covered is: k + c
+    where c is the number of the odd steps and d(r) is the value reached by r.
+
+  Parameters:
+    None
+
+  Outputs:
+    void
+  '''
+  global JUMP_MULTIPLIERS, JUMP_ADDENDS, JUMP_STEPS, JUMP_QUOTIENT_BOUNDS
+  if JUMP_STEPS is not None:
+    return
+
+  addends = np.arange(1 << JUMP_BITS, dtype=np.int64)
+  odd_counts = np.zeros(1 << JUMP_BITS, dtype=np.int64)
+  for _ in range(JUMP_BITS):
+    odds = addends & 1
+    addends = np.where(odds, (3 * addends + 1) >> 1, addends >> 1)
+    odd_counts += odds
+
+  JUMP_MULTIPLIERS = (3 ** odd_counts).astype(np.uint64)
+  JUMP_ADDENDS = addends.astype(np.uint64)
+  JUMP_STEPS = JUMP_BITS + odd_counts
+  JUMP_QUOTIENT_BOUNDS = (UINT64_MASK - JUMP_ADDENDS) // JUMP_MULTIPLIERS
+
+def find_jump_val(val):
+  '''
+  Description:
+    Find the value JUMP_BITS shortcut steps later in the sequence.
+    The input number must be higher than 2^JUMP_BITS
+    so that the sequence does not reach 1 during the jump.
+
+  Parameters:
+    val: int:
+      The number for which the sequence is being determined
+
+  Outputs:
+    [0]: int: The number after the jump
+    [1]: int: The number of the steps of the sequence covered by the jump
+  '''
+  low_bits = val & JUMP_MASK
+  return (
+    int(JUMP_MULTIPLIERS[low_bits]) * (val >> JUMP_BITS) + int(JUMP_ADDENDS[low_bits]),
+    int(JUMP_STEPS[low_bits]))
+
 
 
 
@@ -127,7 +461,7 @@ def find_sequence_1(current_val, counter):
   if next_val == 1:
     return counter
 
-  return counter + find_sequence_2(next_val, 0)
+  return find_sequence_2(next_val, counter)
 
 def solution_1(limit_val):
   '''
@@ -139,11 +473,12 @@ def solution_1(limit_val):
       The upper bound of the problem
 
   Outputs:
-    c_max: int:
-      The number for which the length of the sequence is max
     n: int:
+      The number for which the length of the sequence is max
+    c_max: int:
       The length of the longest sequence
   '''
+  init_sequences(limit_val)
   c_max = 2
   for i in range(3, limit_val):
     c_count = find_sequence_1(i, 0)
@@ -163,44 +498,214 @@ SOLUTION 2
 *******************************************
 '''
 
-ARRAY_BOUND = int(1e7)
-SEQUENCE1 = np.zeros([ARRAY_BOUND, 2], dtype=int) # Array store
-SEQUENCE2 = {} # Dictionary store. For numbers higher than the array upper bound
+ARRAY_BOUND_MAX = int(1e9) # The max upper bound of the array store
+HASH_STORE_SIZE_BITS = 20 # The hash store contains 2 ** HASH_STORE_SIZE_BITS slots
+HASH_STORE_PROBE_LIMIT = 8 # The number of the slots inspected for a number
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15 # Fibonacci hashing: 2 ** 64 / golden ratio
+UINT64_MASK = (1 << 64) - 1
+UINT16_MAX = (1 << 16) - 1
+
+class HashStore:
+  '''
+  Description:
+    A bounded open addressing hash table storing the remaining lengths
+    for the numbers higher than the array upper bound.
+
+    A number is searched in HASH_STORE_PROBE_LIMIT consecutive slots
+    starting from its home slot (linear probing).
+    When all the probed slots are occupied by other numbers,
+    the number in the home slot is evicted.
+    Hence, the memory is bounded while a stored length may be lost,
+    which only causes the sequence to be walked again.
+
+    The slots are allocated on the first insertion.
+  '''
+  __slots__ = ('size_bits', 'keys', 'values')
+
+  def __init__(self, size_bits):
+    '''
+    Parameters:
+      size_bits : int:
+        The hash table contains 2 ** size_bits slots
+    '''
+    self.size_bits = size_bits
+    self.keys = None # np.uint64 per slot: the stored number (0 if empty)
+    self.values = None # np.uint16 per slot: the remaining length of the number
+
+  def find_home_slot(self, val):
+    '''
+    Description:
+      Find the 1st slot to be probed for the input number
+
+    Parameters:
+      val : int:
+        The number for which the sequence is being determined
+
+    Outputs:
+      int: The index of the home slot
+    '''
+    return ((val * HASH_MULTIPLIER) & UINT64_MASK) >> (64 - self.size_bits)
+
+  def get(self, val):
+    '''
+    Description:
+      Get the remaining length of the input number if stored.
+
+    Parameters:
+      val : int:
+        The number for which the sequence is being determined
+
+    Outputs:
+      int: The number of the remaining points:
+        Zero if the input number is not stored
+    '''
+    if self.keys is None or val > UINT64_MASK:
+      return 0
+
+    slot_mask = self.keys.size - 1
+    home_slot = self.find_home_slot(val)
+    for i_probe in range(HASH_STORE_PROBE_LIMIT):
+      slot = (home_slot + i_probe) & slot_mask
+      key = self.keys[slot]
+      if key == val:
+        return int(self.values[slot])
+      if key == 0:
+        return 0
+
+    return 0
+
+  def set(self, val, remainings):
+    '''
+    Description:
+      Set the remaining length of the input number.
+      Evicts the number in the home slot if all probed slots are occupied.
+
+    Parameters:
+      val : int:
+        The number for which the sequence is being determined
+      remainings : int:
+        The number of the remaining points
+
+    Outputs:
+      void
+    '''
+    if val > UINT64_MASK or remainings > UINT16_MAX:
+      return
+
+    if self.keys is None:
+      self.keys = np.zeros(1 << self.size_bits, dtype=np.uint64)
+      self.values = np.zeros(1 << self.size_bits, dtype=np.uint16)
+
+    slot_mask = self.keys.size - 1
+    home_slot = self.find_home_slot(val)
+    for i_probe in range(HASH_STORE_PROBE_LIMIT):
+      slot = (home_slot + i_probe) & slot_mask
+      key = self.keys[slot]
+      if key == val or key == 0:
+        self.keys[slot] = val
+        self.values[slot] = remainings
+        return
+
+    self.keys[home_slot] = val
+    self.values[home_slot] = remainings
+
+# The number of the lookups found (hits) and not found (misses) in the stores.
+# Counted only if COUNT_MEMO_STATS is set (e.g. by the benchmark)
+# so that the lookups of the solutions are not slowed down by the counters.
+MEMO_STATS = {'array_hits': 0, 'array_misses': 0, 'hash_hits': 0, 'hash_misses': 0}
+COUNT_MEMO_STATS = False
+
+ARRAY_BOUND = 0 # The upper bound of the array store: Zero until the first use
+SEQUENCE1 = None # Array store: The remaining lengths (np.uint16) indexed by the numbers
+SEQUENCE2 = HashStore(HASH_STORE_SIZE_BITS) # Hash store. For numbers higher than the array upper bound
+
+def init_sequences(limit_val):
+  '''
+  Description:
+    Allocate the array store on first use sized by the input upper bound.
+    The array store is extended (keeping the stored lengths)
+    if the input upper bound is higher than the current one.
+
+  Parameters:
+    limit_val : int:
+      The upper bound of the problem
 
-def get_visitted_remaining(val):
+  Outputs:
+    void
+  '''
+  global ARRAY_BOUND, SEQUENCE1
+  array_bound = min(limit_val, ARRAY_BOUND_MAX)
+  if array_bound <= ARRAY_BOUND:
+    return
+
+  sequence1 = np.zeros(array_bound, dtype=np.uint16)
+  if SEQUENCE1 is not None:
+    sequence1[:ARRAY_BOUND] = SEQUENCE1
+  SEQUENCE1 = sequence1
+  ARRAY_BOUND = array_bound
+
+def get_remaining(val):
   '''
   Description:
-    Get the number of visitted points and the number of the remaining points
-    from the stored data if exist.
+    Get the number of the remaining points from the stored data if exist.
 
   Parameters:
     val : int:
       The number for which the sequence is being determined
 
   Outputs:
-    [0]: int:
-      The number of visitted points:
-        Zero if the input number is not visitted yet
-    [1]: int:
-      The number of the remaining points:
-        Zero if the input number is not visitted yet
+    int: The number of the remaining points:
+      Zero if the input number is not visitted yet
   '''
   if val < ARRAY_BOUND:
-    return SEQUENCE1[val]
-  if val in SEQUENCE2.keys():
-    return SEQUENCE2[val]
-  return [0, 0]
+    return int(SEQUENCE1[val])
+  return SEQUENCE2.get(val)
+
+def count_memo_lookups(missed_vals, hit_val):
+  '''
+  Description:
+    Add the lookups of a walked sequence to the lookup counters (MEMO_STATS).
+    Called once per sequence (see find_sequence_2)
+    instead of once per lookup in order to keep the lookups fast.
+
+  Parameters:
+    missed_vals : list[int]:
+      The numbers not found in the stores
+    hit_val : int:
+      The number found in the stores:
+        None if the sequence reached 1 without a hit
+
+  Outputs:
+    void
+  '''
+  array_miss_count = sum(val < ARRAY_BOUND for val in missed_vals)
+  MEMO_STATS['array_misses'] += array_miss_count
+  MEMO_STATS['hash_misses'] += len(missed_vals) - array_miss_count
+  if hit_val is not None:
+    MEMO_STATS['array_hits' if hit_val < ARRAY_BOUND else 'hash_hits'] += 1
+
+def reset_memo_stats():
+  '''
+  Description:
+    Reset the lookup counters of the stores (MEMO_STATS).
+
+  Parameters:
+    None
+
+  Outputs:
+    void
+  '''
+  for key in MEMO_STATS:
+    MEMO_STATS[key] = 0
 
-def set_visitted_remaining(val, visitteds, remainings):
+def set_remaining(val, remainings):
   '''
   Description:
-    Set the number of visitted points and the number of the remaining points
+    Set the number of the remaining points
 
   Parameters:
     val : int:
       The number for which the sequence is being determined
-    visitteds : int:
-      The number of visitted points
     remainings : int:
       The number of the remaining points
 
@@ -208,15 +713,18 @@ def set_visitted_remaining(val, visitteds, remainings):
     void
   '''
   if val < ARRAY_BOUND:
-    SEQUENCE1[val][0] = visitteds
-    SEQUENCE1[val][1] = remainings
-
-  SEQUENCE2[val] = [visitteds, remainings]
+    SEQUENCE1[val] = remainings
+  else:
+    SEQUENCE2.set(val, remainings)
 
 def find_sequence_2(current_val, counter):
   '''
   Description:
     The sequence length determination for Solution 2 in the module docstring.
+    The sequence is walked iteratively until 1 or a stored value is reached.
+    The numbers higher than the array upper bound are advanced by the jump tables.
+    The walked values are kept in a path stack
+    and their remaining lengths are stored in a single pass.
 
   Parameters:
     current_val : int
@@ -225,28 +733,92 @@ def find_sequence_2(current_val, counter):
     counter : int
       DESCRIPTION:
         The number of the visitted values up to the input number.
-        Required due to the recursion
+        Added to the length of the sequence
 
   Outputs:
     int:
       DESCRIPTION: The length of the sequence for the input number
+
+  Raises:
+    CollatzConvergenceError:
+      If the length exceeds the step budget or the sequence has a cycle
   '''
-  counter += 1
-  next_val = find_next_val(current_val)
-  if next_val == 1:
-    return counter
+  # Walk the sequence until 1 or a stored value.
+  # Jump over the numbers higher than the array upper bound.
+  init_jump_tables()
+  jump_bound = max(ARRAY_BOUND, JUMP_MASK + 2)
+  step_limit = STEP_BUDGET - counter
+  path = []
+  path_steps = []
+  steps = 0
+  val = current_val
+  remainings = 0
+
+  # Brent's algorithm: the walked values are compared with a checkpoint
+  # refreshed when the number of the steps passes a power of 2
+  # (clipped to the step budget so that the budget is inspected by the same branch).
+  checkpoint = val
+  check_steps = 1
+  while val != 1:
+    remainings = get_remaining(val)
+    if remainings > 0:
+      break
+
+    path.append(val)
+    path_steps.append(steps)
+    if val >= jump_bound:
+      val, jump_steps = find_jump_val(val)
+      steps += jump_steps
+    else:
+      val = find_next_val(val)
+      steps += 1
+
+    if val == checkpoint:
+      raise CollatzConvergenceError([current_val], 'cycle')
+    if steps >= check_steps:
+      if steps > step_limit:
+        raise CollatzConvergenceError([current_val], 'step budget')
+      checkpoint = val
+      check_steps = min(check_steps << 1, step_limit + 1)
+
+  if COUNT_MEMO_STATS:
+    count_memo_lookups(path, val if remainings > 0 else None)
+
+  # Store the remaining lengths of the walked values
+  remainings += steps
+  for val, val_steps in zip(path, path_steps):
+    set_remaining(val, remainings - val_steps)
 
-  totals = get_visitted_remaining(next_val)
-  if counter < totals[0]:
-    return 0
+  return counter + remainings
 
-  totals[0] = counter
-  if totals[1] > 0:
-    return counter + totals[1]
+def find_max_sequence_2(first_val, limit_val):
+  '''
+  Description:
+    Determine the longest sequence for the numbers in [first_val, limit_val)
+    using the single visit method of Solution 2.
 
-  remainings = find_sequence_2(next_val, 0)
-  set_visitted_remaining(next_val, counter, remainings)
-  return counter + remainings
+  Parameters:
+    first_val : int:
+      The lower bound of the numbers (inclusive)
+    limit_val : int:
+      The upper bound of the numbers (exclusive)
+
+  Outputs:
+    n: int:
+      The number for which the length of the sequence is max:
+        None if the range is empty
+    c_max: int:
+      The length of the longest sequence
+  '''
+  n = None
+  c_max = 0
+  for i in range(first_val, limit_val):
+    c_count = find_sequence_2(i, 0)
+    if c_count > c_max:
+      c_max = c_count
+      n = i
+
+  return n, c_max
 
 def solution_2(limit_val):
   '''
@@ -258,48 +830,1314 @@ def solution_2(limit_val):
       The upper bound of the problem
 
   Outputs:
-    c_max: int:
+    n: int:
       The number for which the length of the sequence is max
+    c_max: int:
+      The length of the longest sequence
+  '''
+  init_sequences(limit_val)
+  return find_max_sequence_2(3, limit_val)
+
+
+
+
+
+'''
+*******************************************
+SOLUTION 3
+*******************************************
+'''
+
+BATCH_SIZE = 1 << 16 # The number of lanes pushed through the map in lockstep
+
+def find_sequence_3(starts, jump_bound=None):
+  '''
+  Description:
+    The sequence length determination for Solution 3 in the module docstring.
+    All numbers are pushed through the Collatz map in lockstep.
+    A lane is retired when it reaches 1 or a value stored in the array store.
+    The lanes higher than the array upper bound are advanced by the jump tables.
+
+    The lanes are np.uint64.
+    A lane whose jump would overflow np.uint64 is retired
+    and its sequence is continued by Solution 2 with the python integers.
+
+    The lanes are inspected for the convergence every CHECK_INTERVAL iterations
+    (see inspect_lanes).
+
+  Parameters:
+    starts : np.ndarray:
+      The numbers for which the sequences are determined
+    jump_bound : int:
+      The lanes not lower than the bound are advanced by the jump tables:
+        The array upper bound if None.
+        The lower values must be stored in the array store.
+
+  Outputs:
+    np.ndarray:
+      DESCRIPTION: The lengths of the sequences for the input numbers
+
+  Raises:
+    CollatzConvergenceError:
+      If a length exceeds the step budget or a sequence has a cycle
+  '''
+  init_jump_tables()
+  if jump_bound is None:
+    jump_bound = ARRAY_BOUND
+  jump_bound = max(jump_bound, JUMP_MASK + 2)
+  lengths = np.zeros(starts.size, dtype=np.int64)
+  lanes = np.arange(starts.size)
+  vals = starts.astype(np.uint64)
+  steps = np.zeros(starts.size, dtype=np.int64)
+  checkpoints = np.zeros(starts.size, dtype=np.uint64)
+  iteration = 0
+  while lanes.size:
+    iteration += 1
+    if iteration % CHECK_INTERVAL == 0:
+      inspect_lanes(
+        starts, lanes, vals, steps, checkpoints, iteration // CHECK_INTERVAL)
+
+    # Retire the lanes which reached 1 or a stored value
+    in_bound = vals < ARRAY_BOUND
+    remainings = SEQUENCE1[np.where(in_bound, vals, 0)]
+    hits = in_bound & (remainings > 0)
+    retired = (vals == 1) | hits
+    if COUNT_MEMO_STATS:
+      hit_count = int(np.count_nonzero(hits))
+      MEMO_STATS['array_hits'] += hit_count
+      MEMO_STATS['array_misses'] += int(np.count_nonzero(in_bound)) - hit_count
+
+    # Move the lanes higher than the jump bound by a jump.
+    # The retired lanes are excluded as the jump bound may be lower than the array upper bound.
+    jumps = (vals >= jump_bound) & ~retired
+    if jumps.any():
+      jump_vals = vals[jumps]
+      low_bits = jump_vals & JUMP_MASK
+      high_bits = jump_vals >> JUMP_BITS
+
+      # Retire the lanes overflowing np.uint64 to the python int path
+      overflows = high_bits > JUMP_QUOTIENT_BOUNDS[low_bits]
+      if overflows.any():
+        i_overflows = np.flatnonzero(jumps)[overflows]
+        for i_lane in i_overflows:
+          try:
+            steps[i_lane] = find_sequence_2(int(vals[i_lane]), int(steps[i_lane]))
+          except CollatzConvergenceError as error:
+            raise CollatzConvergenceError(
+              [int(starts[lanes[i_lane]])], error.reason) from error
+        retired[i_overflows] = True
+        remainings[i_overflows] = 0
+        jumps[i_overflows] = False
+        low_bits = low_bits[~overflows]
+        high_bits = high_bits[~overflows]
+
+      vals[jumps] = JUMP_MULTIPLIERS[low_bits] * high_bits + JUMP_ADDENDS[low_bits]
+      steps[jumps] += JUMP_STEPS[low_bits]
+
+    if retired.any():
+      over_budget = steps[retired] > STEP_BUDGET
+      if over_budget.any():
+        raise CollatzConvergenceError(
+          starts[lanes[retired][over_budget]].tolist(), 'step budget')
+
+      lengths[lanes[retired]] = steps[retired] + remainings[retired]
+      actives = ~retired
+      lanes = lanes[actives]
+      vals = vals[actives]
+      steps = steps[actives]
+      jumps = jumps[actives]
+
+    # Move the other lanes one step forward
+    if jumps.any():
+      singles = ~jumps
+      vals[singles] = np.where(
+        vals[singles] & 1, 3 * vals[singles] + 1, vals[singles] >> 1)
+      steps[singles] += 1
+    else:
+      vals = np.where(vals & 1, 3 * vals + 1, vals >> 1)
+      steps += 1
+
+  return lengths
+
+def find_max_sequence_3(first_val, limit_val):
+  '''
+  Description:
+    Determine the longest sequence for the numbers in [first_val, limit_val)
+    using the batch method of Solution 3.
+    The numbers lower than first_val are expected to be in the array store.
+
+  Parameters:
+    first_val : int:
+      The lower bound of the numbers (inclusive)
+    limit_val : int:
+      The upper bound of the numbers (exclusive)
+
+  Outputs:
     n: int:
+      The number for which the length of the sequence is max:
+        None if the range is empty
+    c_max: int:
       The length of the longest sequence
   '''
-  c_max = 2
-  for i in range(3, limit_val):
-    if get_visitted_remaining(i)[0] > 0:
-      continue
+  n = None
+  c_max = 0
+  for block_start in range(first_val, limit_val, BATCH_SIZE):
+    starts = np.arange(block_start, min(block_start + BATCH_SIZE, limit_val))
+    lengths = find_sequence_3(starts)
 
-    c_count = find_sequence_2(i, 0)
-    if c_count > c_max:
-      c_max = c_count
-      n = i
+    # Store the lengths for the next blocks
+    in_bound = starts < ARRAY_BOUND
+    SEQUENCE1[starts[in_bound]] = lengths[in_bound]
+
+    i_max = int(np.argmax(lengths))
+    if lengths[i_max] > c_max:
+      c_max = int(lengths[i_max])
+      n = int(starts[i_max])
 
   return n, c_max
 
+def solution_3(limit_val):
+  '''
+  Description:
+    Solution 3 in the module docstring.
 
+  Parameters:
+    limit_val : int:
+      The upper bound of the problem
 
+  Outputs:
+    n: int:
+      The number for which the length of the sequence is max
+    c_max: int:
+      The length of the longest sequence
+  '''
+  init_sequences(limit_val)
+  return find_max_sequence_3(3, limit_val)
 
 
-if __name__ == '__main__':
-  MAX = int(1e6)
 
-  # Solution 1
-  t0 = time.time()
-  n, c_max = solution_1(MAX)
-  t1 = time.time()
 
-  print('Upper Bound: ' + str(MAX))
 
-  print('\nSolution 1:')
-  print('Sequence length: ' + str(n))
-  print('Number with longest sequence: ' + str(c_max))
-  print('Runtime: ' + str(t1 - t0))
+'''
+*******************************************
+SOLUTION 4
+*******************************************
+'''
 
-  # Solution 2
-  t0 = time.time()
-  n, c_max = solution_2(MAX)
-  t1 = time.time()
+SHARDS_PER_PROCESS = 16 # The number of shards assigned to each worker process
+SHARED_MEMORY = None # The shared memory block of the array store in a worker process
 
-  print('\nSolution 2:')
-  print('Sequence length: ' + str(n))
-  print('Number with longest sequence: ' + str(c_max))
+def init_shared_sequence(shared_memory_name, table_bound, count_memo_stats=False):
+  '''
+  Description:
+    The initializer of the worker processes of Solution 4.
+    Replaces the array store of the process by the one in the shared memory
+    and clears the hash store of the process.
+
+  Parameters:
+    shared_memory_name : str:
+      The name of the shared memory block containing the array store
+    table_bound : int:
+      The upper bound of the array store in the shared memory
+    count_memo_stats : bool:
+      Count the lookups in the worker process (see COUNT_MEMO_STATS)
+
+  Outputs:
+    void
+  '''
+  global ARRAY_BOUND, SEQUENCE1, SEQUENCE2, SHARED_MEMORY, COUNT_MEMO_STATS
+  COUNT_MEMO_STATS = count_memo_stats
+  SHARED_MEMORY = shared_memory.SharedMemory(name=shared_memory_name)
+  ARRAY_BOUND = table_bound
+  SEQUENCE1 = np.ndarray(table_bound, dtype=np.uint16, buffer=SHARED_MEMORY.buf)
+  SEQUENCE2 = HashStore(HASH_STORE_SIZE_BITS)
+
+def find_max_sequence_4(shard):
+  '''
+  Description:
+    The task of the worker processes of Solution 4.
+
+  Parameters:
+    shard : tuple:
+      [0]: int: The lower bound of the shard (inclusive)
+      [1]: int: The upper bound of the shard (exclusive)
+
+  Outputs:
+    n: int:
+      The number for which the length of the sequence is max in the shard
+    c_max: int:
+      The length of the longest sequence in the shard
+    memo_stats: dict:
+      The lookup counters of the shard (see MEMO_STATS)
+  '''
+  reset_memo_stats()
+  n, c_max = find_max_sequence_2(shard[0], shard[1])
+  return n, int(c_max), dict(MEMO_STATS)
+
+def solution_4(limit_val, process_count=None):
+  '''
+  Description:
+    Solution 4 in the module docstring.
+
+  Parameters:
+    limit_val : int:
+      The upper bound of the problem
+    process_count : int:
+      The number of the worker processes:
+        The number of the CPUs if None
+
+  Outputs:
+    n: int:
+      The number for which the length of the sequence is max
+    c_max: int:
+      The length of the longest sequence
+  '''
+  if process_count is None:
+    process_count = multiprocessing.cpu_count()
+
+  # Split the numbers into the shards
+  shard_count = process_count * SHARDS_PER_PROCESS
+  shard_size = max(1, -(-(limit_val - 3) // shard_count))
+  shards = [
+    (first_val, min(first_val + shard_size, limit_val))
+    for first_val in range(3, limit_val, shard_size)]
+
+  # Place the array store into the shared memory
+  table_bound = min(limit_val, ARRAY_BOUND_MAX)
+  shared_block = shared_memory.SharedMemory(
+    create=True, size=table_bound * np.dtype(np.uint16).itemsize)
+  np.ndarray(table_bound, dtype=np.uint16, buffer=shared_block.buf)[:] = 0
+  try:
+    with multiprocessing.Pool(
+        process_count,
+        initializer=init_shared_sequence,
+        initargs=(shared_block.name, table_bound, COUNT_MEMO_STATS)) as pool:
+      # Reduce the shard maxima and sum the lookup counters of the shards
+      n = None
+      c_max = 0
+      for n_shard, c_shard, memo_stats in pool.imap_unordered(find_max_sequence_4, shards):
+        for key, count in memo_stats.items():
+          MEMO_STATS[key] += count
+        if n_shard is None:
+          continue
+        if c_shard > c_max or (c_shard == c_max and n_shard < n):
+          c_max = c_shard
+          n = n_shard
+  finally:
+    shared_block.close()
+    shared_block.unlink()
+
+  return n, c_max
+
+
+
+
+
+'''
+*******************************************
+SOLUTION 5
+*******************************************
+'''
+
+CACHE_MAGIC = b'PE14LEN1' # Identifies a length cache file
+CACHE_HEADER_FORMAT = '<8sQ' # The magic and the covered upper bound
+CACHE_HEADER_SIZE = 64 # The lengths start after the header (aligned)
+CACHE_PATH = os.path.join(tempfile.gettempdir(), 'PE_P14_Collatz.cache')
+
+def read_cache_bound(cache_path):
+  '''
+  Description:
+    Read the upper bound covered by the length cache file.
+    The lengths of all numbers lower than the covered bound are in the file.
+
+  Parameters:
+    cache_path : str:
+      The path of the length cache file
+
+  Outputs:
+    int: The covered upper bound:
+      Zero if the file does not exist
+  '''
+  if not os.path.exists(cache_path):
+    return 0
+
+  with open(cache_path, 'rb') as cache_file:
+    header = cache_file.read(struct.calcsize(CACHE_HEADER_FORMAT))
+  magic, cache_bound = struct.unpack(CACHE_HEADER_FORMAT, header)
+  if magic != CACHE_MAGIC:
+    raise ValueError('Not a Collatz length cache file: ' + cache_path)
+  return cache_bound
+
+def write_cache_bound(cache_path, cache_bound):
+  '''
+  Description:
+    Write the upper bound covered by the length cache file.
+
+  Parameters:
+    cache_path : str:
+      The path of the length cache file
+    cache_bound : int:
+      The covered upper bound
+
+  Outputs:
+    void
+  '''
+  with open(cache_path, 'r+b') as cache_file:
+    cache_file.write(struct.pack(CACHE_HEADER_FORMAT, CACHE_MAGIC, cache_bound))
+
+def open_sequence_cache(cache_path, limit_val):
+  '''
+  Description:
+    Map the length cache file as the array store.
+    The file is created or extended (with zeros) up to the input upper bound.
+    The caller restores the previous array store (see Solution 5).
+
+  Parameters:
+    cache_path : str:
+      The path of the length cache file
+    limit_val : int:
+      The upper bound of the problem
+
+  Outputs:
+    void
+  '''
+  global ARRAY_BOUND, SEQUENCE1
+  cache_bound = read_cache_bound(cache_path)
+  array_bound = max(min(limit_val, ARRAY_BOUND_MAX), cache_bound)
+  if cache_bound == 0:
+    with open(cache_path, 'wb') as cache_file:
+      cache_file.write(struct.pack(CACHE_HEADER_FORMAT, CACHE_MAGIC, 0))
+
+  cache_size = CACHE_HEADER_SIZE + array_bound * np.dtype(np.uint16).itemsize
+  if os.path.getsize(cache_path) < cache_size:
+    os.truncate(cache_path, cache_size)
+
+  SEQUENCE1 = np.memmap(
+    cache_path,
+    dtype=np.uint16,
+    mode='r+',
+    offset=CACHE_HEADER_SIZE,
+    shape=array_bound)
+  ARRAY_BOUND = array_bound
+
+def find_max_length(lengths, first_val):
+  '''
+  Description:
+    Determine the longest sequence from the lengths of consecutive numbers.
+
+  Parameters:
+    lengths : np.ndarray:
+      The lengths of the sequences for consecutive numbers
+    first_val : int:
+      The number corresponding to lengths[0]
+
+  Outputs:
+    n: int:
+      The number for which the length of the sequence is max:
+        None if the input is empty
+    c_max: int:
+      The length of the longest sequence
+  '''
+  if lengths.size == 0:
+    return None, 0
+
+  i_max = int(np.argmax(lengths))
+  return first_val + i_max, int(lengths[i_max])
+
+def solution_5(limit_val, cache_path=CACHE_PATH):
+  '''
+  Description:
+    Solution 5 in the module docstring.
+
+  Parameters:
+    limit_val : int:
+      The upper bound of the problem
+    cache_path : str:
+      The path of the length cache file
+
+  Outputs:
+    n: int:
+      The number for which the length of the sequence is max
+    c_max: int:
+      The length of the longest sequence
+  '''
+  global ARRAY_BOUND, SEQUENCE1
+
+  # Answer from the mapped pages if the file covers the upper bound
+  cache_bound = read_cache_bound(cache_path)
+  if limit_val <= cache_bound:
+    lengths = np.memmap(
+      cache_path,
+      dtype=np.uint16,
+      mode='r',
+      offset=CACHE_HEADER_SIZE,
+      shape=limit_val)
+    return find_max_length(lengths[3:], 3)
+
+  # Compute the tail only and extend the file.
+  # The mapped file replaces the array store only during the run.
+  array_bound, sequence1 = ARRAY_BOUND, SEQUENCE1
+  try:
+    open_sequence_cache(cache_path, limit_val)
+    find_max_sequence_3(max(cache_bound, 3), ARRAY_BOUND)
+    SEQUENCE1.flush()
+    write_cache_bound(cache_path, ARRAY_BOUND)
+
+    n, c_max = find_max_length(SEQUENCE1[3:min(limit_val, ARRAY_BOUND)], 3)
+    n_tail, c_tail = find_max_sequence_3(ARRAY_BOUND, limit_val)
+    if c_tail > c_max:
+      n, c_max = n_tail, c_tail
+  finally:
+    ARRAY_BOUND, SEQUENCE1 = array_bound, sequence1
+
+  return n, c_max
+
+
+
+
+
+'''
+*******************************************
+SOLUTION 6
+*******************************************
+'''
+
+TREE_CEILING_FACTOR = 4 # The default ceiling is TREE_CEILING_FACTOR * the upper bound
+
+def generate_levels(ceiling):
+  '''
+  Description:
+    Generate the Collatz tree backwards from 1 level by level (breadth first).
+    The predecessors of a number m are:
+      2m: always
+      (m - 1)/3: if the result is an odd integer higher than 1 (i.e. m = 4 mod 6)
+    As each number has a single next value, each number is generated once
+    and the level of a number is the length of its sequence.
+    The numbers higher than the ceiling are not generated
+    (i.e. the sequences exceeding the ceiling are not reached).
+
+  Parameters:
+    ceiling : int:
+      The max number generated
+
+  Outputs:
+    generator of tuple:
+      [0]: int: The level (the length of the sequences)
+      [1]: np.ndarray: The numbers in the level
+  '''
+  depth = 0
+  frontier = np.array([1], dtype=np.int64)
+  while frontier.size:
+    yield depth, frontier
+
+    doubles = frontier << 1
+    thirds = (frontier[frontier % 6 == 4] - 1) // 3
+    frontier = np.concatenate((doubles[doubles <= ceiling], thirds[thirds > 1]))
+    depth += 1
+
+def solution_6(limit_val, ceiling=None):
+  '''
+  Description:
+    Solution 6 in the module docstring.
+
+  Parameters:
+    limit_val : int:
+      The upper bound of the problem
+    ceiling : int:
+      The max number generated by the inverse tree:
+        TREE_CEILING_FACTOR * limit_val if None
+
+  Outputs:
+    n: int:
+      The number for which the length of the sequence is max
+    c_max: int:
+      The length of the longest sequence
+  '''
+  if limit_val > ARRAY_BOUND_MAX:
+    raise ValueError('The upper bound exceeds ARRAY_BOUND_MAX')
+  if ceiling is None:
+    ceiling = TREE_CEILING_FACTOR * limit_val
+
+  # Assign the levels of the inverse tree to the numbers
+  init_sequences(limit_val)
+  unassigned_count = limit_val - 2 # The numbers in [2, limit_val)
+  for depth, frontier in generate_levels(ceiling):
+    in_bound = frontier[(frontier < limit_val) & (frontier > 1)]
+    SEQUENCE1[in_bound] = depth
+    unassigned_count -= in_bound.size
+    if unassigned_count <= 0:
+      break
+
+  # Walk forward the numbers not reached below the ceiling
+  unreached = np.flatnonzero(SEQUENCE1[3:limit_val] == 0) + 3
+  for block_start in range(0, unreached.size, BATCH_SIZE):
+    starts = unreached[block_start:block_start + BATCH_SIZE]
+    SEQUENCE1[starts] = find_sequence_3(starts)
+
+  return find_max_length(SEQUENCE1[3:limit_val], 3)
+
+
+
+
+
+'''
+*******************************************
+SOLUTION 7
+*******************************************
+'''
+
+RECORDS_DENSE_BOUND = 1 << 20 # The numbers stored densely for Solution 7
+RECORDS_RESIDUE_MASK = None # True for the residues (mod 2^JUMP_BITS) not dominated
+
+def init_records_residue_mask():
+  '''
+  Description:
+    Build the residue sieve of Solution 7 on first use.
+    Consider two residues r1 < r2 (mod 2^k with k = JUMP_BITS)
+    with the same affine map in the jump tables (see init_jump_tables).
+    For any q > 0, the sequences of q * 2^k + r1 and q * 2^k + r2
+    merge after the same number of steps.
+    Hence, q * 2^k + r2 has the same length as a lower number and is dominated.
+
+  Parameters:
+    None
+
+  Outputs:
+    void
+  '''
+  global RECORDS_RESIDUE_MASK
+  if RECORDS_RESIDUE_MASK is not None:
+    return
+
+  init_jump_tables()
+  jump_keys = (JUMP_STEPS.astype(np.uint64) << np.uint64(40)) | JUMP_ADDENDS
+  _, i_firsts = np.unique(jump_keys, return_index=True)
+  RECORDS_RESIDUE_MASK = np.zeros(1 << JUMP_BITS, dtype=np.bool_)
+  RECORDS_RESIDUE_MASK[i_firsts] = True
+
+def find_record_candidates(first_val, limit_val):
+  '''
+  Description:
+    Sieve the numbers in [first_val, limit_val) dominated by a lower number,
+    i.e. a lower number with a sequence not shorter exists:
+      n = 2 (mod 3): (2n - 1)/3 -> 2n -> n (2 steps longer)
+      n = 4 (mod 6): (n - 1)/3 -> n (1 step longer)
+      n merging with a lower number of the same q (see init_records_residue_mask)
+
+  Parameters:
+    first_val : int:
+      The lower bound of the numbers (inclusive, not lower than 3)
+    limit_val : int:
+      The upper bound of the numbers (exclusive)
+
+  Outputs:
+    np.ndarray: The numbers not dominated
+  '''
+  init_records_residue_mask()
+  vals = np.arange(first_val, limit_val, dtype=np.int64)
+  candidates = (vals % 3 != 2) & ((vals % 6 != 4) | (vals == 4))
+  candidates &= RECORDS_RESIDUE_MASK[vals & JUMP_MASK] | (vals <= JUMP_MASK)
+  return vals[candidates]
+
+def solution_7(limit_val, return_records=False):
+  '''
+  Description:
+    Solution 7 in the module docstring.
+
+  Parameters:
+    limit_val : int:
+      The upper bound of the problem
+    return_records : bool:
+      Return the record holders as well:
+        The numbers with a sequence longer than all lower numbers (from 3)
+
+  Outputs:
+    n: int:
+      The number for which the length of the sequence is max
+    c_max: int:
+      The length of the longest sequence
+    records: list[tuple]:
+      (number, length) pairs of the record holders:
+        Only if return_records is True
+  '''
+  # Store the low numbers densely: the lanes jump till the low numbers
+  dense_bound = min(limit_val, RECORDS_DENSE_BOUND)
+  init_sequences(dense_bound)
+  find_max_sequence_3(3, dense_bound)
+
+  # Any number n with 2n < limit_val is dominated by 2n (1 step longer).
+  # Such numbers are not sieved for the record holders.
+  first_val = 3 if return_records else max(3, (limit_val - 1) // 2 + 1)
+  n = None
+  c_max = 0
+  records = []
+  for block_start in range(first_val, limit_val, BATCH_SIZE):
+    starts = find_record_candidates(
+      block_start, min(block_start + BATCH_SIZE, limit_val))
+    if starts.size == 0:
+      continue
+
+    lengths = find_sequence_3(starts, dense_bound)
+    if return_records:
+      # The running max of the previous numbers (including the previous blocks)
+      running_maxs = np.maximum.accumulate(np.concatenate(([c_max], lengths)))
+      i_records = np.flatnonzero(lengths > running_maxs[:-1])
+      records.extend(
+        (int(starts[i_record]), int(lengths[i_record])) for i_record in i_records)
+
+    i_max = int(np.argmax(lengths))
+    if lengths[i_max] > c_max:
+      c_max = int(lengths[i_max])
+      n = int(starts[i_max])
+
+  if return_records:
+    return n, c_max, records
+  return n, c_max
+
+
+
+
+
+'''
+*******************************************
+RANGE QUERY INDEX
+*******************************************
+'''
+
+class CollatzIndex:
+  '''
+  Description:
+    The range query index in the module docstring.
+    Built once over an upper bound, answers the following queries:
+      The length of the sequence of a number: O(1)
+      The longest sequence in a range of numbers: O(log N)
+      The k longest sequences in a range of numbers: O(k log k log N)
+
+    The lengths of the numbers are determined by Solution 3.
+    A segment tree stores the number with the longest sequence for each node.
+    For the equal lengths, the lower number is preferred (as in the solutions).
+  '''
+  __slots__ = ('bound', 'lengths', 'leaf_offset', 'tree')
+
+  def __init__(self, bound):
+    '''
+    Parameters:
+      bound : int:
+        The upper bound of the numbers in the index
+    '''
+    if bound > ARRAY_BOUND_MAX:
+      raise ValueError('The index bound exceeds ARRAY_BOUND_MAX')
+
+    # The lengths of the numbers in [0, bound)
+    init_sequences(bound)
+    find_max_sequence_3(3, bound)
+    self.bound = bound
+    self.lengths = SEQUENCE1[:bound].copy()
+    self.lengths[:3] = [0, 0, 1][:bound]
+
+    # The leaves are the numbers, the parents are the longer children
+    self.leaf_offset = 1 << max(0, (bound - 1).bit_length())
+    index_dtype = np.uint32 if bound < (1 << 32) else np.uint64
+    self.tree = np.zeros(2 * self.leaf_offset, dtype=index_dtype)
+    self.tree[self.leaf_offset:self.leaf_offset + bound] = np.arange(bound)
+    level_start = self.leaf_offset
+    while level_start > 1:
+      children = self.tree[level_start:2 * level_start]
+      lefts = children[0::2]
+      rights = children[1::2]
+      self.tree[level_start // 2:level_start] = np.where(
+        self.lengths[rights] > self.lengths[lefts], rights, lefts)
+      level_start //= 2
+
+  def get_length(self, val):
+    '''
+    Description:
+      Get the length of the sequence for the input number.
+      The numbers out of the index are determined by Solution 2.
+
+    Parameters:
+      val : int:
+        The number for which the sequence is determined
+
+    Outputs:
+      int: The length of the sequence for the input number
+    '''
+    if val < self.bound:
+      return int(self.lengths[val])
+    return int(find_sequence_2(val, 0))
+
+  def find_max(self, first_val, limit_val):
+    '''
+    Description:
+      Determine the longest sequence for the numbers in [first_val, limit_val).
+
+    Parameters:
+      first_val : int:
+        The lower bound of the numbers (inclusive)
+      limit_val : int:
+        The upper bound of the numbers (exclusive)
+
+    Outputs:
+      n: int:
+        The number for which the length of the sequence is max
+      c_max: int:
+        The length of the longest sequence
+    '''
+    if not 0 <= first_val < limit_val <= self.bound:
+      raise ValueError('The range is empty or out of the index')
+
+    n = None
+    c_max = -1
+    node_left = first_val + self.leaf_offset
+    node_right = limit_val + self.leaf_offset
+    while node_left < node_right:
+      if node_left & 1:
+        n, c_max = self.select_longer(n, c_max, int(self.tree[node_left]))
+        node_left += 1
+      if node_right & 1:
+        node_right -= 1
+        n, c_max = self.select_longer(n, c_max, int(self.tree[node_right]))
+      node_left >>= 1
+      node_right >>= 1
+
+    return n, c_max
+
+  def select_longer(self, n, c_max, val):
+    '''
+    Description:
+      Compare the input number with the current longest sequence.
+
+    Parameters:
+      n : int:
+        The number with the current longest sequence
+      c_max : int:
+        The length of the current longest sequence
+      val : int:
+        The number to be compared
+
+    Outputs:
+      n: int:
+        The number with the longer sequence (the lower one for the equal lengths)
+      c_max: int:
+        The length of the longer sequence
+    '''
+    c_count = int(self.lengths[val])
+    if c_count > c_max or (c_count == c_max and val < n):
+      return val, c_count
+    return n, c_max
+
+  def find_top(self, first_val, limit_val, k):
+    '''
+    Description:
+      Determine the k longest sequences for the numbers in [first_val, limit_val).
+      The range is split at the number with the longest sequence
+      and the two subranges are queued by their longest sequences.
+
+    Parameters:
+      first_val : int:
+        The lower bound of the numbers (inclusive)
+      limit_val : int:
+        The upper bound of the numbers (exclusive)
+      k : int:
+        The number of the sequences requested
+
+    Outputs:
+      list[tuple]: (number, length) pairs ordered by the decreasing length
+    '''
+    n, c_max = self.find_max(first_val, limit_val)
+    queue = [(-c_max, n, first_val, limit_val)]
+    tops = []
+    while queue and len(tops) < k:
+      c_neg, n, range_start, range_end = heapq.heappop(queue)
+      tops.append((n, -c_neg))
+      for subrange in ((range_start, n), (n + 1, range_end)):
+        if subrange[0] < subrange[1]:
+          n_sub, c_sub = self.find_max(subrange[0], subrange[1])
+          heapq.heappush(queue, (-c_sub, n_sub, subrange[0], subrange[1]))
+
+    return tops
+
+
+
+
+
+'''
+*******************************************
+TRAJECTORY TREE
+*******************************************
+'''
+
+class CollatzTree:
+  '''
+  Description:
+    The trajectory tree in the module docstring.
+    The sequences of the numbers lower than a bound form a tree rooted at 1
+    where the parent of a number is the next value in its sequence.
+
+    The nodes are identified as follows:
+      The numbers lower than the bound: the number itself
+      The higher numbers reached by the sequences (the overflow):
+        bound + the index in the sorted overflow array
+
+    For each node, the ancestors 2^j levels above are stored (binary lifting).
+    Hence, a sequence is streamed without applying the Collatz map
+    and the merge point of two sequences is found in O(log L)
+    where L is the length of the longest sequence.
+
+    The ancestors take a full size array per level (log2(L) levels):
+    About 4 bytes per node per level (e.g. about 1 GB for the bound 1e7
+    where the overflow doubles the number of the nodes).
+  '''
+  __slots__ = ('bound', 'overflow_vals', 'depths', 'ancestors')
+
+  def __init__(self, bound):
+    '''
+    Parameters:
+      bound : int:
+        The upper bound of the numbers whose sequences are in the tree
+    '''
+    if bound > ARRAY_BOUND_MAX:
+      raise ValueError('The tree bound exceeds ARRAY_BOUND_MAX')
+
+    # Collect the overflow numbers reached by the sequences
+    vals = np.arange(bound, dtype=np.int64)
+    next_vals = np.where(vals & 1, 3 * vals + 1, vals >> 1)
+    next_vals[:2] = [0, 1][:bound]
+    frontier = np.unique(next_vals[next_vals >= bound])
+    overflow_chunks = [frontier]
+    overflow_set = set(frontier.tolist())
+    while frontier.size:
+      next_vals = np.where(frontier & 1, 3 * frontier + 1, frontier >> 1)
+      next_vals = np.unique(next_vals[next_vals >= bound]).tolist()
+      frontier = np.array(
+        [val for val in next_vals if val not in overflow_set], dtype=np.int64)
+      overflow_set.update(frontier.tolist())
+      overflow_chunks.append(frontier)
+    self.bound = bound
+    self.overflow_vals = np.sort(np.concatenate(overflow_chunks))
+
+    # The parents of the nodes: the root (1) is its own parent
+    vals = np.concatenate((vals, self.overflow_vals))
+    next_vals = np.where(vals & 1, 3 * vals + 1, vals >> 1)
+    next_vals[:2] = [0, 1]
+    index_dtype = np.int32 if vals.size < (1 << 31) else np.int64
+    parents = np.where(
+      next_vals < bound,
+      next_vals,
+      bound + np.searchsorted(self.overflow_vals, next_vals)).astype(index_dtype)
+
+    # The depths of the nodes: the lengths of the sequences
+    init_sequences(bound)
+    find_max_sequence_3(3, bound)
+    self.depths = np.empty(vals.size, dtype=np.uint16)
+    self.depths[:bound] = SEQUENCE1[:bound]
+    self.depths[:min(bound, 3)] = [0, 0, 1][:bound]
+    for block_start in range(bound, vals.size, BATCH_SIZE):
+      self.depths[block_start:block_start + BATCH_SIZE] = find_sequence_3(
+        vals[block_start:block_start + BATCH_SIZE])
+
+    # The ancestors 2^j levels above the nodes
+    self.ancestors = [parents]
+    max_depth = int(self.depths.max()) if vals.size else 0
+    while (1 << len(self.ancestors)) <= max_depth:
+      self.ancestors.append(self.ancestors[-1][self.ancestors[-1]])
+
+  def find_node(self, val):
+    '''
+    Description:
+      Find the node of the input number.
+
+    Parameters:
+      val : int:
+        The number for which the sequence is being determined
+
+    Outputs:
+      int: The node of the input number:
+        None if the input number is not in the tree
+    '''
+    if 0 < val < self.bound:
+      return val
+
+    i_overflow = int(np.searchsorted(self.overflow_vals, val))
+    if (
+        i_overflow < self.overflow_vals.size and
+        self.overflow_vals[i_overflow] == val):
+      return self.bound + i_overflow
+    return None
+
+  def find_val(self, node):
+    '''
+    Description:
+      Find the number of the input node.
+
+    Parameters:
+      node : int:
+        The node of the number
+
+    Outputs:
+      int: The number of the input node
+    '''
+    if node < self.bound:
+      return node
+    return int(self.overflow_vals[node - self.bound])
+
+  def generate_sequence(self, val):
+    '''
+    Description:
+      Stream the sequence of the input number ending with 1.
+      The values out of the tree are determined by the Collatz map
+      until the sequence enters the tree.
+
+    Parameters:
+      val : int:
+        The number for which the sequence is determined (positive)
+
+    Outputs:
+      generator of int: The values of the sequence
+
+    Raises:
+      ValueError: If the input number is not positive
+    '''
+    if val <= 0:
+      raise ValueError('The number must be positive')
+    return self.stream_sequence(val)
+
+  def stream_sequence(self, val):
+    '''
+    Description:
+      The generator of generate_sequence.
+
+    Parameters:
+      val : int:
+        The number for which the sequence is determined (positive)
+
+    Outputs:
+      generator of int: The values of the sequence
+    '''
+    node = self.find_node(val)
+    while node is None:
+      yield val
+      val = find_next_val(val)
+      node = self.find_node(val)
+
+    parents = self.ancestors[0]
+    while node != 1:
+      yield self.find_val(node)
+      node = int(parents[node])
+    yield 1
+
+  def find_merge(self, val_a, val_b):
+    '''
+    Description:
+      Find the first value common to the sequences of the input numbers
+      (the lowest common ancestor of the two nodes).
+
+    Parameters:
+      val_a : int:
+        The 1st number (positive, must be in the tree)
+      val_b : int:
+        The 2nd number (positive, must be in the tree)
+
+    Outputs:
+      int: The value where the two sequences merge
+
+    Raises:
+      ValueError: If a number is not positive or not in the tree
+    '''
+    if val_a <= 0 or val_b <= 0:
+      raise ValueError('The number must be positive')
+    node_a = self.find_node(val_a)
+    node_b = self.find_node(val_b)
+    if node_a is None or node_b is None:
+      raise ValueError('The number is not in the tree')
+
+    # Lift the deeper node to the depth of the other
+    if self.depths[node_a] < self.depths[node_b]:
+      node_a, node_b = node_b, node_a
+    depth_diff = int(self.depths[node_a]) - int(self.depths[node_b])
+    level = 0
+    while depth_diff:
+      if depth_diff & 1:
+        node_a = int(self.ancestors[level][node_a])
+      depth_diff >>= 1
+      level += 1
+    if node_a == node_b:
+      return self.find_val(node_a)
+
+    # Lift both nodes to just below the merge point
+    for ancestors in reversed(self.ancestors):
+      if ancestors[node_a] != ancestors[node_b]:
+        node_a = int(ancestors[node_a])
+        node_b = int(ancestors[node_b])
+    return self.find_val(int(self.ancestors[0][node_a]))
+
+
+
+
+
+'''
+*******************************************
+SEQUENCE METRICS
+*******************************************
+'''
+
+# The metrics of a sequence:
+#   length: The number of the steps to 1 (as in SEQUENCE1)
+#   max_value: The max value reached by the sequence
+#   glide: The number of the steps to the 1st value lower than the number
+#   odd_steps: The number of the odd (3n + 1) steps
+METRICS_DTYPE = np.dtype([
+  ('length', np.uint16),
+  ('max_value', np.uint64),
+  ('glide', np.uint16),
+  ('odd_steps', np.uint16)])
+METRICS_BOUND = 0 # The metrics of the numbers lower than the bound are stored
+# The max odd value whose 3n + 1 step fits np.uint64.
+# The max values reached by the numbers lower than ARRAY_BOUND_MAX are about 1.4e18
+# (below the limit of about 6.1e18) as the max value is stored as np.uint64.
+METRICS_ODD_VAL_MAX = np.uint64((UINT64_MASK - 1) // 3)
+METRICS = None # The metrics indexed by the numbers (parallel to SEQUENCE1)
+
+def find_sequence_metrics(starts):
+  '''
+  Description:
+    Determine all metrics of the sequences in a single pass
+    pushing the numbers through the Collatz map in lockstep (see Solution 3).
+    The input numbers must be consecutive
+    and the metrics of the lower numbers must be stored.
+    A lane is retired when it drops below the 1st input number.
+    Then, the metrics stored for the value reached complete the metrics of the lane.
+    The lanes are inspected for the convergence as in Solution 3.
+
+    The lanes are np.uint64 without the python int path of Solution 3
+    as the max value is stored as np.uint64 (see METRICS_DTYPE).
+    The 3n + 1 step of the lanes is checked against METRICS_ODD_VAL_MAX,
+    which is not exceeded for the numbers lower than ARRAY_BOUND_MAX.
+
+  Parameters:
+    starts : np.ndarray:
+      The consecutive numbers for which the sequences are determined
+
+  Outputs:
+    np.ndarray (METRICS_DTYPE):
+      DESCRIPTION: The metrics of the sequences for the input numbers
+
+  Raises:
+    CollatzConvergenceError:
+      If a length exceeds the step budget or a sequence has a cycle
+    OverflowError:
+      If a value of a sequence exceeds np.uint64
+  '''
+  first_val = int(starts[0])
+  metrics = np.zeros(starts.size, dtype=METRICS_DTYPE)
+  lanes = np.arange(starts.size)
+  lane_starts = starts.astype(np.uint64)
+  vals = lane_starts.copy()
+  max_vals = lane_starts.copy()
+  steps = np.zeros(starts.size, dtype=np.int64)
+  odd_steps = np.zeros(starts.size, dtype=np.int64)
+  glides = np.zeros(starts.size, dtype=np.int64)
+  checkpoints = np.zeros(starts.size, dtype=np.uint64)
+  iteration = 0
+  while lanes.size:
+    iteration += 1
+    if iteration % CHECK_INTERVAL == 0:
+      inspect_lanes(
+        starts, lanes, vals, steps, checkpoints, iteration // CHECK_INTERVAL)
+
+    # Retire the lanes which dropped below the input numbers
+    retired = vals < first_val
+    if retired.any():
+      over_budget = steps[retired] > STEP_BUDGET
+      if over_budget.any():
+        raise CollatzConvergenceError(
+          starts[lanes[retired][over_budget]].tolist(), 'step budget')
+
+      stored = METRICS[vals[retired]]
+      i_lanes = lanes[retired]
+      metrics['length'][i_lanes] = steps[retired] + stored['length']
+      metrics['max_value'][i_lanes] = np.maximum(
+        max_vals[retired], stored['max_value'])
+      metrics['glide'][i_lanes] = glides[retired]
+      metrics['odd_steps'][i_lanes] = odd_steps[retired] + stored['odd_steps']
+
+      actives = ~retired
+      lanes = lanes[actives]
+      lane_starts = lane_starts[actives]
+      vals = vals[actives]
+      max_vals = max_vals[actives]
+      steps = steps[actives]
+      odd_steps = odd_steps[actives]
+      glides = glides[actives]
+
+    # Move the active lanes one step forward
+    odds = (vals & 1).astype(bool)
+    if vals.size and vals.max() > METRICS_ODD_VAL_MAX:
+      overflows = odds & (vals > METRICS_ODD_VAL_MAX)
+      if overflows.any():
+        raise OverflowError('The sequences of {} exceed np.uint64'.format(
+          starts[lanes[overflows]].tolist()))
+    vals = np.where(odds, 3 * vals + 1, vals >> 1)
+    steps += 1
+    odd_steps += odds
+    np.maximum(max_vals, vals, out=max_vals)
+    glided = (glides == 0) & (vals < lane_starts)
+    glides[glided] = steps[glided]
+
+  return metrics
+
+def compute_metrics(limit_val):
+  '''
+  Description:
+    Determine and store the metrics of the numbers lower than the input bound.
+    Only the numbers not stored yet are computed.
+    The lengths are stored in the array store as well.
+
+  Parameters:
+    limit_val : int:
+      The upper bound of the numbers
+
+  Outputs:
+    void
+  '''
+  global METRICS, METRICS_BOUND
+  if limit_val <= METRICS_BOUND:
+    return
+  if limit_val > ARRAY_BOUND_MAX:
+    raise ValueError('The upper bound exceeds ARRAY_BOUND_MAX')
+
+  metrics = np.zeros(limit_val, dtype=METRICS_DTYPE)
+  if METRICS is None:
+    metrics[1:2] = (0, 1, 0, 0)
+  else:
+    metrics[:METRICS_BOUND] = METRICS[:METRICS_BOUND]
+  METRICS = metrics
+
+  init_sequences(limit_val)
+  for block_start in range(max(METRICS_BOUND, 2), limit_val, BATCH_SIZE):
+    starts = np.arange(block_start, min(block_start + BATCH_SIZE, limit_val))
+    METRICS[starts] = find_sequence_metrics(starts)
+    SEQUENCE1[starts] = METRICS['length'][starts]
+    METRICS_BOUND = int(starts[-1]) + 1
+
+  METRICS_BOUND = limit_val
+
+def get_metrics(first_val, limit_val):
+  '''
+  Description:
+    Get the metrics of the numbers in [first_val, limit_val).
+
+  Parameters:
+    first_val : int:
+      The lower bound of the numbers (inclusive)
+    limit_val : int:
+      The upper bound of the numbers (exclusive)
+
+  Outputs:
+    np.ndarray (METRICS_DTYPE): The metrics indexed by (number - first_val)
+  '''
+  compute_metrics(limit_val)
+  return METRICS[first_val:limit_val].copy()
+
+def find_metric_max(metric, first_val, limit_val):
+  '''
+  Description:
+    Determine the number with the max metric in [first_val, limit_val).
+    For the equal metrics, the lower number is preferred.
+
+  Parameters:
+    metric : str:
+      The name of the metric (see METRICS_DTYPE)
+    first_val : int:
+      The lower bound of the numbers (inclusive)
+    limit_val : int:
+      The upper bound of the numbers (exclusive)
+
+  Outputs:
+    n: int:
+      The number for which the metric is max:
+        None if the range is empty
+    metric_max: int:
+      The max metric
+  '''
+  compute_metrics(limit_val)
+  return find_max_length(METRICS[metric][first_val:limit_val], first_val)
+
+
+
+
+
+if __name__ == '__main__':
+  MAX = int(1e6)
+
+  # Solution 1
+  t0 = time.time()
+  n, c_max = solution_1(MAX)
+  t1 = time.time()
+
+  print('Upper Bound: ' + str(MAX))
+
+  print('\nSolution 1:')
+  print('Number with longest sequence: ' + str(n))
+  print('Sequence length: ' + str(c_max))
+  print('Runtime: ' + str(t1 - t0))
+
+  # Solution 2
+  t0 = time.time()
+  n, c_max = solution_2(MAX)
+  t1 = time.time()
+
+  print('\nSolution 2:')
+  print('Number with longest sequence: ' + str(n))
+  print('Sequence length: ' + str(c_max))
+  print('Runtime: ' + str(t1 - t0))
+
+  # Solution 3
+  t0 = time.time()
+  n, c_max = solution_3(MAX)
+  t1 = time.time()
+
+  print('\nSolution 3:')
+  print('Number with longest sequence: ' + str(n))
+  print('Sequence length: ' + str(c_max))
+  print('Runtime: ' + str(t1 - t0))
+
+  # Solution 4
+  t0 = time.time()
+  n, c_max = solution_4(MAX)
+  t1 = time.time()
+
+  print('\nSolution 4:')
+  print('Number with longest sequence: ' + str(n))
+  print('Sequence length: ' + str(c_max))
+  print('Runtime: ' + str(t1 - t0))
+
+  # Solution 5
+  t0 = time.time()
+  n, c_max = solution_5(MAX)
+  t1 = time.time()
+
+  print('\nSolution 5:')
+  print('Number with longest sequence: ' + str(n))
+  print('Sequence length: ' + str(c_max))
+  print('Runtime: ' + str(t1 - t0))
+
+  # Solution 6
+  t0 = time.time()
+  n, c_max = solution_6(MAX)
+  t1 = time.time()
+
+  print('\nSolution 6:')
+  print('Number with longest sequence: ' + str(n))
+  print('Sequence length: ' + str(c_max))
+  print('Runtime: ' + str(t1 - t0))
+
+  # Solution 7
+  t0 = time.time()
+  n, c_max = solution_7(MAX)
+  t1 = time.time()
+
+  print('\nSolution 7:')
+  print('Number with longest sequence: ' + str(n))
+  print('Sequence length: ' + str(c_max))
   print('Runtime: ' + str(t1 - t0))
@@ -0,0 +1,337 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark for the solutions of the ProjectEuler problem 14 (PE_P14_Collatz).
+
+Description:
+  Runs each solution (engine) for each upper bound of a bound ladder
+  and reports the following for each run:
+    The result (n, c_max),
+    The wall time,
+    The peak resident memory (RSS) of the process,
+    The lookup counters of the array store and the hash store (MEMO_STATS,
+    counted once per sequence while the benchmark sets COUNT_MEMO_STATS).
+
+  Each run is executed in a new process (spawned, not forked)
+  so that the stores of an engine are not reused by another one
+  and the peak RSS belongs to a single run.
+
+  The results are written as JSON.
+  A previous output can be given as the baseline
+  in order to detect the regressions in the wall time and the results.
+
+Usage:
+  python PE_P14_Collatz_benchmark.py --output bench.json
+  python PE_P14_Collatz_benchmark.py --baseline bench.json --tolerance 0.2
+  python PE_P14_Collatz_benchmark.py --engines solution_3 solution_6 --bounds 1e4 1e8
+
+@author: baris.albayrak.ieee@gmail.com
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import PE_P14_Collatz as collatz
+
+# The default bound ladder
+BOUNDS = [int(1e4), int(1e5), int(1e6), int(1e7), int(1e8)]
+
+# The engines and the max bound run by default for each engine.
+# The slow engines are skipped for the higher bounds of the default ladder
+# (the bounds given explicitly are run for all engines).
+ENGINES = {
+  'solution_1': int(1e6),
+  'solution_2': int(1e6),
+  'solution_3': int(1e8),
+  'solution_4': int(1e7),
+  'solution_5': int(1e8),
+  'solution_6': int(1e8),
+  'solution_7': int(1e8)}
+
+def run_engine(engine, limit_val):
+  '''
+  Description:
+    Run an engine for an upper bound in the current process.
+
+  Parameters:
+    engine : str:
+      The name of the solution function in PE_P14_Collatz
+    limit_val : int:
+      The upper bound of the problem
+
+  Outputs:
+    dict: The measurements of the run
+  '''
+  rss_import = get_peak_rss_mb()
+  collatz.COUNT_MEMO_STATS = True
+  collatz.reset_memo_stats()
+  cache_path = None
+  args = (limit_val,)
+  if engine == 'solution_5':
+    cache_descriptor, cache_path = tempfile.mkstemp(suffix='.cache')
+    os.close(cache_descriptor)
+    os.remove(cache_path)
+    args = (limit_val, cache_path)
+
+  try:
+    t0 = time.perf_counter()
+    n, c_max = getattr(collatz, engine)(*args)
+    t1 = time.perf_counter()
+  finally:
+    if cache_path is not None and os.path.exists(cache_path):
+      os.remove(cache_path)
+
+  return {
+    'engine': engine,
+    'bound': limit_val,
+    'n': None if n is None else int(n),
+    'c_max': int(c_max),
+    'wall_time': t1 - t0,
+    'import_rss_mb': rss_import,
+    'peak_rss_mb': get_peak_rss_mb(),
+    'memo': dict(collatz.MEMO_STATS),
+    'memo_hit_rates': get_hit_rates(collatz.MEMO_STATS)}
+
+def get_peak_rss_mb():
+  '''
+  Description:
+    Get the peak resident memory of the current process and its children.
+
+  Parameters:
+    None
+
+  Outputs:
+    float: The peak RSS in MB
+  '''
+  peak_rss = max(
+    resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+  # ru_maxrss is in bytes on macOS and in kilobytes on the others
+  if sys.platform == 'darwin':
+    return peak_rss / 2 ** 20
+  return peak_rss / 2 ** 10
+
+def get_hit_rates(memo_stats):
+  '''
+  Description:
+    Get the hit rates of the array store and the hash store.
+
+  Parameters:
+    memo_stats : dict:
+      The lookup counters (see PE_P14_Collatz.MEMO_STATS)
+
+  Outputs:
+    dict: The hit rate for each store: None if the store is not used
+  '''
+  hit_rates = {}
+  for store in ('array', 'hash'):
+    hits = memo_stats[store + '_hits']
+    lookups = hits + memo_stats[store + '_misses']
+    hit_rates[store] = hits / lookups if lookups else None
+  return hit_rates
+
+def run_engine_task(connection, engine, limit_val):
+  '''
+  Description:
+    The task of the benchmark process of a run.
+    Sends the measurements (or the error) through the input connection.
+
+  Parameters:
+    connection : multiprocessing.connection.Connection:
+      The connection to the parent process
+    engine : str:
+      The name of the solution function in PE_P14_Collatz
+    limit_val : int:
+      The upper bound of the problem
+
+  Outputs:
+    void
+  '''
+  try:
+    connection.send(run_engine(engine, limit_val))
+  except Exception as error: # Reported to the parent
+    connection.send({'engine': engine, 'bound': limit_val, 'error': repr(error)})
+  finally:
+    connection.close()
+
+def run_benchmark(engines, bounds, capped=True):
+  '''
+  Description:
+    Run each engine for each bound in a new process.
+    A run is recorded as an error with the exit code of the process
+    if the process dies without a result (e.g. killed for the memory).
+
+  Parameters:
+    engines : list[str]:
+      The names of the solution functions in PE_P14_Collatz
+    bounds : list[int]:
+      The upper bounds of the problem
+    capped : bool:
+      Skip the bounds higher than the max bound of the engine (see ENGINES)
+
+  Outputs:
+    list[dict]: The measurements of the runs
+  '''
+  context = multiprocessing.get_context('spawn')
+  results = []
+  for engine in engines:
+    for limit_val in bounds:
+      if capped and limit_val > ENGINES.get(engine, max(bounds)):
+        print('{:<12} {:>11}: skipped (above the max bound {} of the engine)'.format(
+          engine, limit_val, ENGINES[engine]), flush=True)
+        continue
+
+      parent_connection, child_connection = context.Pipe(duplex=False)
+      process = context.Process(
+        target=run_engine_task,
+        args=(child_connection, engine, limit_val))
+      process.start()
+      child_connection.close()
+      try:
+        result = parent_connection.recv()
+      except EOFError: # The process died without a result
+        result = None
+      process.join()
+      if result is None:
+        result = {
+          'engine': engine,
+          'bound': limit_val,
+          'error': 'The process exited without a result',
+          'exit_code': process.exitcode}
+
+      results.append(result)
+      print(format_result(result), flush=True)
+
+  return results
+
+def format_result(result):
+  '''
+  Description:
+    Format the measurements of a run as a single line.
+
+  Parameters:
+    result : dict:
+      The measurements of a run
+
+  Outputs:
+    str: The formatted line
+  '''
+  prefix = '{:<12} {:>11}: '.format(result['engine'], result['bound'])
+  if 'error' in result:
+    if 'exit_code' in result:
+      return prefix + 'ERROR {} (exit code {})'.format(result['error'], result['exit_code'])
+    return prefix + 'ERROR ' + result['error']
+
+  hit_rates = [
+    '-' if hit_rate is None else '{:.3f}'.format(hit_rate)
+    for hit_rate in result['memo_hit_rates'].values()]
+  return prefix + (
+    'n={} c_max={} time={:.3f}s rss={:.1f}MB hits(array/hash)={}/{}'.format(
+      result['n'],
+      result['c_max'],
+      result['wall_time'],
+      result['peak_rss_mb'],
+      *hit_rates))
+
+def compare_with_baseline(results, baseline_results, tolerance):
+  '''
+  Description:
+    Compare the runs with the runs of the baseline for the same engine and bound.
+    A run is a regression if:
+      Its result differs from the baseline, or
+      Its wall time exceeds the baseline by more than the tolerance.
+
+  Parameters:
+    results : list[dict]:
+      The measurements of the runs
+    baseline_results : list[dict]:
+      The measurements of the runs of the baseline
+    tolerance : float:
+      The accepted relative increase in the wall time
+
+  Outputs:
+    list[str]: The descriptions of the regressions
+  '''
+  baselines = {
+    (result['engine'], result['bound']): result
+    for result in baseline_results
+    if 'error' not in result}
+  regressions = []
+  for result in results:
+    baseline = baselines.get((result['engine'], result['bound']))
+    if baseline is None:
+      continue
+
+    prefix = '{} {}: '.format(result['engine'], result['bound'])
+    if 'error' in result:
+      regressions.append(prefix + 'failed: ' + result['error'])
+    elif (result['n'], result['c_max']) != (baseline['n'], baseline['c_max']):
+      regressions.append(prefix + 'result ({}, {}) != baseline ({}, {})'.format(
+        result['n'], result['c_max'], baseline['n'], baseline['c_max']))
+    elif result['wall_time'] > baseline['wall_time'] * (1 + tolerance):
+      regressions.append(prefix + 'wall time {:.3f}s > baseline {:.3f}s'.format(
+        result['wall_time'], baseline['wall_time']))
+
+  return regressions
+
+def main():
+  '''
+  Description:
+    The main function
+
+  Parameters:
+    None (see the command line arguments)
+
+  Returns:
+    int: The exit code: 1 if a regression is detected, 0 otherwise
+  '''
+  parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+  parser.add_argument(
+    '--engines', nargs='+', default=list(ENGINES), choices=list(ENGINES),
+    help='The solutions to run')
+  parser.add_argument(
+    '--bounds', nargs='+', type=float,
+    help='The upper bounds of the ladder (run for all engines if given)')
+  parser.add_argument(
+    '--output', help='The path of the JSON output')
+  parser.add_argument(
+    '--baseline', help='The path of a previous JSON output to compare with')
+  parser.add_argument(
+    '--tolerance', type=float, default=0.2,
+    help='The accepted relative increase in the wall time')
+  args = parser.parse_args()
+
+  if args.bounds is None:
+    results = run_benchmark(args.engines, BOUNDS)
+  else:
+    results = run_benchmark(args.engines, [int(bound) for bound in args.bounds], capped=False)
+  report = {
+    'python': platform.python_version(),
+    'numpy': np.__version__,
+    'machine': platform.machine(),
+    'cpu_count': os.cpu_count(),
+    'results': results}
+  if args.output:
+    with open(args.output, 'w') as output_file:
+      json.dump(report, output_file, indent=2)
+
+  if not args.baseline:
+    return 0
+
+  with open(args.baseline) as baseline_file:
+    baseline_results = json.load(baseline_file)['results']
+  regressions = compare_with_baseline(results, baseline_results, args.tolerance)
+  for regression in regressions:
+    print('REGRESSION: ' + regression)
+  return 1 if regressions else 0
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -11,7 +11,7 @@ Nomenclature:
   P2: Number of moves limitation to terminate analysis
   n: Repeat count requirement for a pattern to be acceptable
   w: After P1 moves, perform pattern detection once in every w moves
-  Z: The limitation for the number of rows and columns of the grid - ARRAY_SIZE_GRID
+  Z: The number of the grid tiles visited by the ant (see AntSimulation)
 
 Assumptions:
   The studies on the problem show that,
@@ -52,37 +52,103 @@ Method:
   `detect_pattern` method applies an optimized KMP method for the pattern detection.
   See the method's docstring for the details.
   
+  Alternatively, PeriodDetector performs the pattern detection online
+  on every move in amortized constant time (perform_online_travel).
+  It maintains the prefix function of KMP for a window of moves
+  which is restarted with a doubling length.
+  A pattern is accepted when the moves from the window start to the current move
+  are at least PERIOD_DETECTOR_WINDOW_MIN moves long
+  and are the smallest period repeated at least n times.
+  Hence, the online detection requires neither P1 nor w.
+  The minimum window length rejects the short fake patterns
+  following a window start (e.g. n equal symbols).
+  However, a fake pattern of the arbitrary region may still be accepted
+  if it covers the minimum window length and repeats n times (see CAUTION).
+  The time complexity of the online detection is O(T) for the worst case.
+  See the class docstring for the details.
+  
+  detect_pattern_autocorrelation performs the pattern detection in batch
+  for a trailing window of moves (e.g. after a travel or once in every w moves).
+  The pattern lengths are ranked by the autocorrelation of the moves
+  determined by FFT in O(W log W) for a window of W moves.
+  Only the strongest lags are verified exactly.
+  The ranking does not reject the fake patterns:
+  A fake pattern may be ranked among the strongest lags (e.g. for a small n).
+  Hence, the verification requires the lag to hold for the last
+  AUTOCORRELATION_VERIFICATION_LENGTH_MIN symbols at least,
+  which is much longer than the fake patterns of the arbitrary region.
+  
   Each move of the travel is assigned to two ids,
   one excluding the grid information while the other including.
   Hence, the 1st move id contains the following information:
-    a. The current color of the cell before flipping,
-    b. The orientation of the ant in x-direction before rotation.
-    c. The orientation of the ant in y-direction before rotation
-  The three input parameters yield 8 possible values for the 1st move id
-  as the 2nd and 3rd are constrained by NEWS (North, East, ...) directions.
+    a. The current color of the cell before the move,
+    b. The current state of the ant (a turmite, see below),
+    c. The orientation of the ant in x-direction before rotation.
+    d. The orientation of the ant in y-direction before rotation
+  The input parameters yield (colour count * state count * 4) possible values
+  for the 1st move id as the 3rd and 4th are constrained by NEWS (North, East, ...) directions.
+  Langton's ant has two colours and a single state: 8 possible values.
   
   The 2nd move id, additionally, contains the grid locations:
     a. Current grid location in x-direction
     b. Current grid location in y-direction
   
-  The five input parameters yield [8 * ARRAY_SIZE_GRID ^ 2] possible values
-  for the 2nd move id.
+  The grid locations are not bounded.
+  Hence, the 2nd move id is a linear combination of the five input parameters
+  (see get_move_ids).
   
   By defining the move ids, we can normalize
-  the detection of the pattern in a 2D colour grid of 1-bit-cells into
+  the detection of the pattern in a 2D colour grid into
   the detection of the pattern in a 1D sequence of ids.
   
-  During the travel, the following static global arrays are stored:
-    1. The reduced id (the 1st id above) of each move: MOVE_INDEX_TO_ID_REDUCED
-    2. The full id (the 2nd id above) of each move: MOVE_INDEX_TO_ID_FULL
-    3. The count of the occurrences of each move id: MOVE_ID_TO_REDUCED_OCCURANCE
-    4. The index of each occurrence of each move id: MOVE_ID_TO_REDUCED_INDEX
-    5. The color of each cell: GRID_CELL_COLORS
-    6. The total black cell count for each move: MOVE_INDEX_TO_BLACK_COUNT
+  The simulation is not limited to Langton's ant:
+  Any turmite rule (e.g. 'RLR', 'LLRR' or a state table) is compiled
+  into flat lookup tables indexed by the 1st move id (see TurmiteRule).
+  The cells are stored as uint8 colours (the colour 0 is white)
+  and the black cell count is the number of the cells with a nonzero colour.
+  Hence, the pattern detection and the black cell count work for any rule.
+  
+  During the travel, the following arrays are stored by the simulation (AntSimulation):
+    1. The reduced id (the 1st id above) of each move: move_index_to_id_reduced
+    2. The full id (the 2nd id above) of each move: move_index_to_id_full
+    3. The count of the occurrences of each move id: move_id_to_reduced_occurrence
+    4. The index of each occurrence of each move id: move_id_to_reduced_index
+    5. The color of each cell: grid_cell_colors
+    6. The total black cell count for each move: move_index_to_black_count
   
   The above arrays relate the move indices, ids, and black cell counts.
   The first four arrays are very efficient in the pattern detection,
   while the last two are used to determine the black cell count.
+  
+  The moves are performed by a kernel (perform_travel_chunk) working on plain ints:
+    The grid is a dictionary of square tiles (a byte per cell) allocated on demand,
+    The written colour, the next state and direction and the grid location change
+    are looked up by the reduced move id (i.e. by the colour, the state and the direction),
+    The full move id is derived from the unbounded grid location.
+  The kernel fills the arrays in chunks of moves
+  ending at the moves inspected by the pattern detection.
+  
+  AntBatch moves K ants in lockstep (e.g. for the studies over
+  many initial locations and directions):
+    The grids of the ants are stored in a single uint8 array,
+    The writes, the turns and the moves of all ants are performed
+    by a few array operations (fancy indexing) per move,
+    The trace of an ant is loaded to a simulation (AntSimulation)
+    which runs the pattern detection.
+  
+  MacroAntSimulation moves the ant through small tiles (macro tiles) by macro steps
+  (e.g. for the rules without a highway):
+  The moves of the ant from entering a macro tile till leaving it depend only on
+  the colours of the tile, the entry cell, the state and the direction.
+  Hence, the transitions are memoized in a bounded LRU cache (TileTransitionCache)
+  and the ant skips the moves of the repeated transitions.
+  The macro steps do not store the moves (i.e. no pattern detection).
+  
+  After the pattern detection, HighwayPattern captures the highway:
+  the black cell counts of the arbitrary region and a single pattern repeat,
+  the pattern length and the black cell count change per pattern repeat.
+  Hence, the black cell count for any N (or an array of N) is determined
+  exactly by the integer arithmetic in O(1) time per N without any further move.
 
 CAUTION:
   The ant is known to follow some patterns in the arbitrary region as well.
@@ -97,6 +163,11 @@ CAUTION:
     2. Use larger n -> e.g. n = 100 (still risky!!!)
   
   Anyway, safety of the algorithm is dependent on the constants used!!!
+  The online pattern detection does not depend on P1 and w
+  but accepts a fake pattern covering PERIOD_DETECTOR_WINDOW_MIN moves with n repeats.
+  PE_P349_LangtonsAnt_sweep runs the simulations (AntSimulation) for
+  the combinations of P1, w, n and the start direction in a process pool
+  and reports the runtime and the agreement with the online pattern detection.
 
 Note:
   Keep in mind that another pattern can be obtained
@@ -121,15 +192,22 @@ Space Complexity:
   The problem requests the black cell count after N = 1E18 moves.
   The travel in this approach contains
   P1 moves in the best case and P2 moves in the worst case.
-  The row and column-wise size of the travel is limited to Z (ARRAY_SIZE_GRID).
+  The grid is not bounded. It is stored in tiles (a byte per cell)
+  allocated when the ant enters a tile for the first time.
   See Nomenclature section for P1, P2, and Z.
   
   The arrays listed in the Method section are the resources used.
-  They are static and allocated by P2 and Z.
-  Hence, the space complexity is S(aP2) + S(bZ^2) where
-  a and b are constants and P2, Z are independent.
-  Hence, the space complexity is linear for P2 but quadratic for Z,
+  The move arrays grow geometrically with the moves (up to P2)
+  while the grid is allocated by Z.
+  The move indices and the counts are stored as int64.
+  Hence, the space complexity is S(aP2) + S(bZ) where
+  a and b are constants and Z <= P2.
+  Hence, the space complexity is linear for P2 and Z,
   which is not memory critical as P2 and Z are too small compared to N.
+  
+  AntBatch stores a grid of 4 ^ BATCH_GRID_BITS bytes and a byte per move for each ant
+  (two bytes per move for the rules with more than 128 reduced move ids).
+  Hence, the space complexity of a batch is linear for K and P2.
 
 Time Complexity:
   Let's assume that P2 > T (i.e., the algorithm succeeds).
@@ -207,519 +285,2116 @@ Time Complexity:
   
   Note that, the algorithm contains only the basic operations
   like bit equality, increment, decrement, list/array random access, etc.
+  The 2nd and the 3rd loops (the inner two of the three loops of detect_pattern)
+  are performed by array comparisons.
+  Hence, the time complexity is not changed but the cubic part runs in compiled code.
 """
 
+import collections
+
 import numpy as np
 
-# The size limit for the containers indexed by the grid IDs
-ARRAY_SIZE_GRID = np.uint16(512)
-
-# The size limit for the containers indexed by the reduced move ID (see get_move_ids)
-ARRAY_SIZE_MOVE_ID_REDUCED = np.uint8(8)
-
-# The size limit for the containers indexed by the move indices
-ARRAY_SIZE_MOVE_INDEX = np.uint16(30000)
-
-# Stores the colors of the cells of the grid
-# GRID_CELL_COLORS[i_row][i_clm]: np.bool_:
-# True if the cell is black
-GRID_CELL_COLORS = np.zeros(
-  shape=(ARRAY_SIZE_GRID, ARRAY_SIZE_GRID),
-  dtype=np.bool_)
-
-# Stores the reduced move IDs indexed by move indices:
-# MOVE_INDEX_TO_ID_FULL[move_index]: uint8:
-# See get_move_ids for the definition of the reduced move ID
-MOVE_INDEX_TO_ID_REDUCED = np.zeros(
-  shape=(ARRAY_SIZE_MOVE_INDEX),
-  dtype=np.uint8)
-
-# Stores the full move IDs indexed by move indices:
-# MOVE_INDEX_TO_ID_FULL[move_index]: uint32:
-# See get_move_ids for the definition of the full move id
-MOVE_INDEX_TO_ID_FULL = np.zeros(
-  shape=(ARRAY_SIZE_MOVE_INDEX),
-  dtype=np.uint32)
-
-# Stores the occurrence/count of the reduced move ids indexed by the reduced move id:
-# MOVE_ID_TO_REDUCED_OCCURRENCE[move_id_reduced]: uint16:
-# The number of occurrences of move_id_reduced during the travel
-# One of the values in the range: [0, ARRAY_SIZE_MOVE_INDEX]:
-# 0: If move_id_reduced has no occurrence
-# ARRAY_SIZE_MOVE_INDEX: If all moves have the same id (move_id_reduced)
-MOVE_ID_TO_REDUCED_OCCURRENCE = np.zeros(
-  shape=(ARRAY_SIZE_MOVE_ID_REDUCED),
-  dtype=np.uint16)
-
-# Stores the move indices indexed by the reduced move id and the occurrence/count of it:
-# MOVE_ID_TO_REDUCED_INDEX[move_id_reduced, i_occurrence]: uint16:
-# The index of the move corresponding to the ith occurrence of move_id_reduced.
-# A move id may be repeated during the travel of the ant.
-# Hence, the array is two-dimensional
-# where the 2nd index is for the occurrence of the move id.
-MOVE_ID_TO_REDUCED_INDEX = np.zeros(
-  shape=(ARRAY_SIZE_MOVE_ID_REDUCED, ARRAY_SIZE_MOVE_INDEX),
-  dtype=np.uint16)
-
-# Stores the black cell count indexed by the move index:
-# MOVE_INDEX_TO_BLACK_COUNT[move_index]: uint16:
-# The number of black cells at the ith move
-MOVE_INDEX_TO_BLACK_COUNT = np.zeros(
-  shape=(ARRAY_SIZE_MOVE_INDEX),
-  dtype=np.uint16)
-
-# Stores the rotation relations based on the reduced move id.
-# ROTATE_ORIENTATIONS_REDUCED[move_id_reduced][0]: np.int8: X-orientation after the rotation
-# ROTATE_ORIENTATIONS_REDUCED[move_id_reduced][1]: np.int8: Y-orientation after the rotation
-# See get_move_ids for the definition of the reduced move id
-ROTATE_ORIENTATIONS_REDUCED = [
-  [np.int8(1), np.int8(0)],  # [WHITE] North -> East
-  [np.int8(0), np.int8(-1)], # [WHITE] East -> South
-  [np.int8(0), np.int8(1)],  # [WHITE] West -> North
-  [np.int8(-1), np.int8(0)], # [WHITE] South -> West
-  [np.int8(-1), np.int8(0)], # [BLACK] North -> West
-  [np.int8(0), np.int8(1)],  # [BLACK] East -> North
-  [np.int8(0), np.int8(-1)], # [BLACK] West -> South
-  [np.int8(1), np.int8(0)]]  # [BLACK] South -> East
+# The number of the rows (and columns) of a grid tile: 2 ^ GRID_TILE_BITS
+GRID_TILE_BITS = 6
+GRID_TILE_MASK = (1 << GRID_TILE_BITS) - 1
+
+# The number of the bytes of a grid tile (a byte per cell)
+GRID_TILE_BYTE_COUNT = 1 << (2 * GRID_TILE_BITS)
+
+# The number of the bits reserved for the column in the full move id (see get_move_ids)
+MOVE_ID_FULL_ROW_BITS = 32
+
+# The initial size of the containers indexed by the move indices
+# The containers grow geometrically during the travel (see AntSimulation.reserve_move_arrays)
+ARRAY_SIZE_MOVE_INDEX = 30000
+
+# The size limit for the moves simulated before the move arrays are filled
+TRAVEL_CHUNK_SIZE = 4096
+
+# The length of the 1st window of the online pattern detection (see PeriodDetector)
+PERIOD_DETECTOR_WINDOW_MIN = 64
+
+# The length of the trailing window of the autocorrelation pattern detection
+# and the number of the strongest lags verified (see detect_pattern_autocorrelation)
+AUTOCORRELATION_WINDOW_LENGTH = 4096
+AUTOCORRELATION_CANDIDATE_COUNT = 8
+
+# The min number of the symbol pairs a lag apart which must be equal
+# for a lag to be accepted by the autocorrelation pattern detection.
+# The runs of the equal pairs in the arbitrary region are shorter than 100 moves
+# for any lag (see detect_pattern_autocorrelation).
+AUTOCORRELATION_VERIFICATION_LENGTH_MIN = 1024
+
+# The number of the rows (and columns) of the grid of an ant in a batch: 2 ^ BATCH_GRID_BITS
+# and the number of the moves performed between the retirements (see AntBatch)
+BATCH_GRID_BITS = 8
+BATCH_CHECK_INTERVAL = 32
+
+# The number of the rows (and columns) of a macro tile: 2 ^ MACRO_TILE_BITS,
+# the max number of the moves of a macro tile transition
+# and the max number of the transitions cached (see TileTransitionCache)
+MACRO_TILE_BITS = 3
+MACRO_TILE_MASK = (1 << MACRO_TILE_BITS) - 1
+MACRO_TILE_BYTE_COUNT = 1 << (2 * MACRO_TILE_BITS)
+MACRO_TRANSITION_MOVE_COUNT_MAX = 1 << 12
+MACRO_CACHE_SIZE_MAX = 1 << 16
+
+# Stores the orientations of the directions.
+# DIR_ID_TO_ORIENTATION[dir_id][0]: int: X-orientation (the row change of a move)
+# DIR_ID_TO_ORIENTATION[dir_id][1]: int: Y-orientation (the column change of a move)
+DIR_ID_TO_ORIENTATION = [
+  (0, 1),  # North
+  (1, 0),  # East
+  (-1, 0), # West
+  (0, -1)] # South
+
+# Stores the direction after a turn of a turmite rule.
+# TURN_TO_DIR_IDS[turn][dir_id]: int: The direction after the turn
+# The turns are: N (no turn), R (right), L (left) and U (u-turn)
+# where R rotates the orientation (dir_x, dir_y) to (-dir_y, dir_x)
+TURN_TO_DIR_IDS = {
+  'N': [0, 1, 2, 3],
+  'R': [2, 0, 3, 1],  # North -> West, East -> North, West -> South, South -> East
+  'L': [1, 3, 0, 2],  # North -> East, East -> South, West -> North, South -> West
+  'U': [3, 2, 1, 0]}
+
+class TurmiteRule:
+  """
+  Description:
+    The rule of a turmite (a generalized Langton's ant)
+    compiled into flat lookup tables indexed by the reduced move id
+    (see get_move_ids):
+      (color * state_count + state) * 4 + dir_id
+  
+    A turmite on a cell with a colour in a state:
+      1. Turns (see TURN_TO_DIR_IDS),
+      2. Writes a colour to the cell,
+      3. Switches to the next state,
+      4. Moves forward by a cell.
+    The colour 0 is the colour of the initial grid (white).
+    Hence, the cells with a nonzero colour are the black cells of Langton's ant.
+  
+    The rule is defined by either of the following:
+      A string of turns (e.g. 'RL' for Langton's ant, 'RLR', 'LLRR'):
+        A single state turmite turning by the ith turn on the colour i
+        and writing the colour i + 1 (0 after the last colour).
+      A state table:
+        table[state][color] = (the written colour, the turn, the next state)
+
+  Attributes:
+    color_count: int
+      The number of the colours
+    state_count: int
+      The number of the states
+    move_id_count: int
+      The number of the reduced move ids: color_count * state_count * 4
+    move_id_to_color: list[int]
+      The colour written to the cell
+    move_id_to_state_dir: list[int]
+      The state and the direction after the move: state * 4 + dir_id
+    move_id_to_row_delta: list[int]
+      The row change of the move
+    move_id_to_clm_delta: list[int]
+      The column change of the move
+    move_id_to_location_delta: list[int]
+      The change of the grid location key (i_row << MOVE_ID_FULL_ROW_BITS) + i_clm
+    move_id_to_nonzero_delta: list[int]
+      The change of the number of the nonzero cells: -1, 0 or 1
+  """
+  __slots__ = (
+    'color_count',
+    'state_count',
+    'move_id_count',
+    'move_id_to_color',
+    'move_id_to_state_dir',
+    'move_id_to_row_delta',
+    'move_id_to_clm_delta',
+    'move_id_to_location_delta',
+    'move_id_to_nonzero_delta')
+
+  def __init__(self, rule):
+    """
+    Description:
+      Compiles the lookup tables of a rule.
+
+    Parameters:
+      rule: str or list[list[tuple(int, str, int)]]
+        The string of turns or the state table (see the class docstring)
+
+    Raises:
+      ValueError: If the rule is not valid
+    """
+    if isinstance(rule, str):
+      color_count = len(rule)
+      table = [[
+        ((color + 1) % color_count, turn, 0)
+        for color, turn in enumerate(rule.upper())]]
+    else:
+      table = [list(state_rule) for state_rule in rule]
+    if not table or not table[0] or any(len(state_rule) != len(table[0]) for state_rule in table):
+      raise ValueError('The rule must define a transition for each colour and state')
+    if len(table[0]) > 256:
+      raise ValueError('The number of the colours cannot exceed 256')
+
+    self.color_count = len(table[0])
+    self.state_count = len(table)
+    self.move_id_count = self.color_count * self.state_count * 4
+    self.move_id_to_color = []
+    self.move_id_to_state_dir = []
+    self.move_id_to_row_delta = []
+    self.move_id_to_clm_delta = []
+    self.move_id_to_location_delta = []
+    self.move_id_to_nonzero_delta = []
+    for color in range(self.color_count):
+      for state in range(self.state_count):
+        color_next, turn, state_next = table[state][color]
+        if (turn not in TURN_TO_DIR_IDS or
+            not 0 <= color_next < self.color_count or
+            not 0 <= state_next < self.state_count):
+          raise ValueError(
+            'Invalid transition for the colour {} and the state {}: {}'.format(
+              color, state, table[state][color]))
+        for dir_id in range(4):
+          dir_id_next = TURN_TO_DIR_IDS[turn][dir_id]
+          row_delta, clm_delta = DIR_ID_TO_ORIENTATION[dir_id_next]
+          self.move_id_to_color.append(color_next)
+          self.move_id_to_state_dir.append(state_next * 4 + dir_id_next)
+          self.move_id_to_row_delta.append(row_delta)
+          self.move_id_to_clm_delta.append(clm_delta)
+          self.move_id_to_location_delta.append(
+            (row_delta << MOVE_ID_FULL_ROW_BITS) + clm_delta)
+          self.move_id_to_nonzero_delta.append(int(color_next != 0) - int(color != 0))
+
+# The rule of Langton's ant (Project Euler Problem #349)
+LANGTONS_ANT_RULE = TurmiteRule('RL')
+
+def get_dir_id(dir_x, dir_y):
+  """
+  Description:
+    Returns the id of a direction.
+
+  Parameters:
+    dir_x: np.int8
+      X-direction: One of the following: 0, 1, -1
+    dir_y: np.int8
+      Y-direction: One of the following: 0, 1, -1
+
+  Returns:
+    int: 0 (N), 1 (E), 2 (W) or 3 (S)
+
+  Modifies:
+    None
+  """
+  return DIR_ID_TO_ORIENTATION.index((int(dir_x), int(dir_y)))
 
 def get_move_ids(
     current_cell_color,
     current_dir_x,
     current_dir_y,
     current_row,
-    current_clm):
+    current_clm,
+    current_state=0,
+    rule=LANGTONS_ANT_RULE):
   """
   Description:
     Each move of the travel is assigned to two ids
     one excluding the grid information while the other including.
     Hence, the 1st move id contains the following information:
-      a. The current colour of the cell before flipping,
-      b. The orientation of the ant in x-direction before rotation
-      c. The orientation of the ant in y-direction before rotation
-    The three input parameters yield 8 possible values for the 1st move id
-    as the 2nd and 3rd are constrained by NEWS (North, East, ...) directions.
+      a. The current colour of the cell before the move,
+      b. The current state of the turmite (0 for Langton's ant),
+      c. The orientation of the ant in x-direction before rotation
+      d. The orientation of the ant in y-direction before rotation
+    The 1st move id is the index of the move in the lookup tables of the rule
+    (see TurmiteRule):
+      (color * state_count + state) * 4 + dir_id
+    as the 3rd and 4th are constrained by NEWS (North, East, ...) directions.
   
     The 2nd move id, additionally, contains the grid locations:
       a. Current grid location in x-direction
       b. Current grid location in y-direction
-    The five input parameters yield [8 * ARRAY_SIZE_GRID ^ 2] possible values
-    for the 2nd move id.
+    The grid locations are not bounded.
+    Hence, the 2nd move id is a linear combination of the input parameters:
+      move_id_count * ((row << MOVE_ID_FULL_ROW_BITS) + clm) + move_id_reduced
+    so that the difference of two full move ids determines
+    the differences of the reduced move ids and the grid locations
+    (while the column difference is lower than 2 ^ (MOVE_ID_FULL_ROW_BITS - 1)
+    and the full move id fits in int64).
   
   Parameters:
-    current_cell_color: np.bool_
-      The color of the cell before flipping
-      True if black
+    current_cell_color: int
+      The color of the cell before the move
     current_dir_x: np.int8
       X-direction of the ant before the rotation
       One of the following: 0, 1, -1
     current_dir_y: np.int8
       Y-direction of the ant before the rotation
       One of the following: 0, 1, -1
-    current_row: np.uint16
+    current_row: int
       Current grid location in x-direction
-    current_clm: np.uint16
+    current_clm: int
       Current grid location in y-direction
+    current_state: int
+      Current state of the turmite
+    rule: TurmiteRule
+      The rule of the turmite
   
   Returns:
-    move_id_reduced: np.uint8
+    move_id_reduced: int
       The reduced id of the input move excluding the grid information:
-      One of the values in the range: [0, 8]
-    move_id_full: np.uint32
-      The full id of the input move including the grid information:
-      One of the values in the range: [0, 8 * ARRAY_SIZE_GRID ^ 2]
+      One of the values in the range: [0, rule.move_id_count)
+    move_id_full: np.int64
+      The full id of the input move including the grid information
   
   Modifies:
     None
   """
-  move_id_dir = 0  # u == 0 and v == 1 by definition (North)
-  if current_dir_x == 1:  # v == 0 by definition (East)
-    move_id_dir = 1
-  elif current_dir_x == -1:  # v == 0 by definition (West)
-    move_id_dir = 2
-  elif current_dir_y == -1:  # u == 0 by definition (South)
-    move_id_dir = 3
-  
-  coeff_dir = np.uint8(4)
-  move_id_reduced = np.uint8(coeff_dir * current_cell_color + move_id_dir)
-  
-  coeff_clm = np.uint32(8)
-  coeff_row = np.uint32(coeff_clm * np.uint32(ARRAY_SIZE_GRID))
-  move_id_full = np.uint32(
-    np.uint32(coeff_row * (current_row - 1)) +
-    np.uint32(coeff_clm * (current_clm - 1) + move_id_reduced))
+  move_id_reduced = (
+    (int(current_cell_color) * rule.state_count + int(current_state)) * 4 +
+    get_dir_id(current_dir_x, current_dir_y))
+  
+  move_id_full = np.int64(
+    rule.move_id_count * ((int(current_row) << MOVE_ID_FULL_ROW_BITS) + int(current_clm)) +
+    move_id_reduced)
   return move_id_reduced, move_id_full
 
-def inspect_pattern_once(
-    pattern_length,
-    pattern_start_move_index_ith,
-    pattern_start_move_index_jth):
+def grow_array(array, size, axis=0):
   """
   Description:
-    Performs the inspections involved in the 3rd loop
-    described in the docstring of detect_pattern function.
-
-    Consider two sequences of moves with the same length (pattern_length):
-      1. Starting from pattern_start_move_index_ith
-      2. Starting from pattern_start_move_index_jth
-
-    Inspects all corresponding moves from the two sequences
-    whether they satisfy the following pattern requirements:
-      1. The cell colour must be the same
-      2. The row-wise shift must be the same
-      3. The clm-wise shift must be the same
-    The above checks can be performed using MOVE_INDEX_TO_ID_FULL
-    as it contains all the three information.
+    Returns a copy of the input array extended along an axis
+    keeping the contents of the input array.
+    The extension is filled with zeros.
 
   Parameters:
-    pattern_length: np.uint16
-      The length of the inspected pattern
-    pattern_start_move_index_ith: np.uint16
-      The move index where the inspected pattern starts
-    pattern_start_move_index_jth: np.uint16
-      The move index where the inspected pattern repeat starts
+    array: np.ndarray
+      The array to extend
+    size: int
+      The new size of the axis
+    axis: int
+      The extended axis
 
   Returns:
-    bool: True if a pattern repeats once
+    np.ndarray: The extended array
 
   Modifies:
     None
   """
-  # Get the difference between the corresponding 1st pattern move ids
-  diff_full_1st = np.int32(
-    np.int32(MOVE_INDEX_TO_ID_FULL[pattern_start_move_index_ith]) -
-    np.int32(MOVE_INDEX_TO_ID_FULL[pattern_start_move_index_jth]))
-
-  # Run a loop with the range of the input pattern length
-  for i in range(1, pattern_length):
-    # The difference between the corresponding pattern move ids must be the same
-    diff_full_current = np.int32(
-      np.int32(MOVE_INDEX_TO_ID_FULL[pattern_start_move_index_ith + i]) -
-      np.int32(MOVE_INDEX_TO_ID_FULL[pattern_start_move_index_jth + i]))
-    if diff_full_current != diff_full_1st:
-      return False
-
-  # None of the corresponding moves failed -> A pattern found
-  return True
+  shape = list(array.shape)
+  shape[axis] = size
+  array_grown = np.zeros(shape, dtype=array.dtype)
+  array_grown[tuple(slice(0, axis_size) for axis_size in array.shape)] = array
+  return array_grown
 
-def inspect_pattern_repeated_req(
-    pattern_repeat_count_req,
-    pattern_length,
-    pattern_start_move_index_ith):
+def find_pattern_candidates(symbols, pattern_length_max, candidate_count):
   """
   Description:
-    Performs the inspections involved in the 2nd loop
-    described in the docstring of detect_pattern function.
-    Inspects the reduced and the full move ids to check whether a sequence of the 
-    pattern_length number of moves starting at the ith move index repeats n times.
+    Ranks the pattern lengths (lags) by the autocorrelation of the symbols:
+      The number of the symbols equal to the symbol a lag later
+      divided by the number of the compared symbol pairs.
+    The autocorrelation of the categorical symbols is the sum of
+    the autocorrelations of the indicator sequences of the distinct symbols,
+    each determined by FFT (zero padded to prevent the circular overlap).
+  
+    The lag of a pattern and its multiples correlate for the whole pattern portion.
+    Hence, the highway pattern is ranked among the strongest lags
+    when the pattern covers most of the symbols.
+    The lags of the fake patterns may be ranked among the strongest lags as well
+    (e.g. the ranking does not reject the fake patterns).
 
   Parameters:
-    pattern_repeat_count_req: np.uint8
-      The required number of repeats for a pattern to be accepted
-    pattern_length: np.uint16
-      The length of the inspected pattern
-    pattern_start_move_index_ith: np.uint16
-      The move index where the inspected pattern starts
+    symbols: np.ndarray
+      The symbols of the consecutive moves (see AntSimulation.get_move_symbols)
+    pattern_length_max: int
+      The max lag ranked
+    candidate_count: int
+      The number of the returned lags
 
   Returns:
-    bool: True if a pattern repeats for pattern_repeat_count_req
+    np.ndarray: The strongest lags in descending order of the autocorrelation
+    (the shorter lag is ranked first for equal autocorrelations)
 
   Modifies:
     None
   """
-  # Run a loop with the range of the input pattern repeat requirement
-  for i_pattern_repeat in range(pattern_repeat_count_req):
-    # The pattern starting move index for the jth pattern repeat
-    pattern_start_move_index_jth = (
-      pattern_start_move_index_ith -
-      pattern_length * (i_pattern_repeat + 1))
-
-    # Inspect the reduced and the full move ids for the jth pattern repeat
-    if not inspect_pattern_once(
-        pattern_length,
-        pattern_start_move_index_ith,
-        pattern_start_move_index_jth):
-      return False
+  symbol_count = symbols.size
+  fft_size = 1 << int(2 * symbol_count - 1).bit_length()
+  _, symbol_ids = np.unique(symbols, return_inverse=True)
+  indicators = np.zeros((symbol_ids.max() + 1, symbol_count))
+  indicators[symbol_ids, np.arange(symbol_count)] = 1.
+  spectrums = np.fft.rfft(indicators, n=fft_size)
+  autocorrelation = np.fft.irfft(
+    (spectrums * spectrums.conj()).real.sum(axis=0), n=fft_size)
 
-  # The pattern detection not failed -> A pattern repeating n times found
-  return True
+  # Normalize the match counts by the number of the compared pairs
+  lags = np.arange(1, pattern_length_max + 1)
+  match_ratios = np.rint(autocorrelation[lags]) / (symbol_count - lags)
+  return lags[np.lexsort((lags, -match_ratios))[:candidate_count]]
 
-def detect_pattern(current_move_index, pattern_repeat_count_req):
+class PeriodDetector:
   """
   Description:
-    Let's assume that the current move is the kth occurrence of
-    the reduced move id (rmi) corresponding to the input move id.
-    The method applies an optimized KMP in order to detect
-    whether a pattern exists starting from the rmi.
-    The optimized KMP examines the occurances of the rmis instead of inspecting the rmis.
-    The pattern requirement is achieved when
-    the sequence of the occurances repeats n times periodically.
+    The online pattern detection consuming the moves one by one.
+  
+    Each move (except the 1st one) is represented by a symbol
+    (see AntSimulation.get_move_symbols).
+  
+    The symbols are collected in a window starting at a move index (window start).
+    The prefix function of KMP is maintained for the window incrementally.
+    The smallest period of the window is:
+      p = the window length - the prefix function of the whole window
+    The prefix function is checked on every move (i.e. for every prefix of the window).
+    A pattern is detected when the window length is:
+      at least n * p (i.e. the window is the pattern repeated n times) and
+      at least PERIOD_DETECTOR_WINDOW_MIN (i.e. the 1st window limit).
+    The minimum length rejects the short runs of repeated symbols
+    right after a window start, which would be accepted for a small p otherwise.
+    A fake pattern of the arbitrary region covering the minimum length
+    and repeating n times is accepted (i.e. the detection is not a proof).
     See Nomenclature section of the module docstring for the definition of n.
+  
+    The window cannot contain the arbitrary region for a pattern to be detected.
+    Hence, the window is restarted after the last move
+    when its length reaches a limit which is doubled for each restart.
+    The first window starting after the arbitrary region (T)
+    detects the highway pattern with period P:
+      The window starts before 2 * T + a constant,
+      The pattern is detected n * P moves after the window start.
+  
+    The prefix function is amortized constant per move.
+    Hence, the detection is performed on every move in O(1) amortized time
+    without delaying the detection (P1) or skipping the moves (w).
 
-  Parameters:
-    current_move_index: int
-      The index of the current move
-    pattern_repeat_count_req: np.uint8
+  Attributes:
+    pattern_repeat_count_req: int
       The required number of repeats for a pattern to be accepted
+    window_start: int
+      The move index of the 1st symbol in the window
+    window_limit: int
+      The window is restarted when its length reaches the limit
+    symbols: list[int]
+      The symbols in the window
+    prefixes: list[int]
+      The prefix function of KMP for the symbols in the window
+  """
+  __slots__ = (
+    'pattern_repeat_count_req',
+    'window_start',
+    'window_limit',
+    'symbols',
+    'prefixes')
 
-  Returns:
-    move_index_pattern_start: uint16
-      The move index where the pattern starts formation
-    move_index_pattern_end: uint16
-      The move index where the pattern ends
+  def __init__(self, pattern_repeat_count_req):
+    """
+    Description:
+      Creates a detector with an empty window starting at the 2nd move.
 
-  Method:
-    The method is an optimized KMP method based on the occurrences of the reduced move ids.
-    Consider the reduced move ids as letters (a, b, c, ...).
-    Consider the sequence of reduced move ids as a string: ...abacadabacadabacada
-    Consider "a" is the reduced move id corresponding to the input move.
-    As you can see, abacad is the pattern we are looking for,
-    but in that pattern, "a" is repeated many times.
-    Consider, the last "a" is the kth occurrence of "a".
-    The method inspects the (k-1)th, (k-2)th, ... nth occurrences of "a"
-    if any satisfies the pattern rules.
-    For the above example (...abacadabacadabacada):
-      (k-1)th: Fail: the current sequence is 'ad' while the previous sequence is 'ac'
-      (k-2)th: Fail: the current sequence is 'acad' while the previous sequence is 'adab'
-      (k-3)th: Success: both the current and the previous sequences are 'abacad'
-    The sequence shall repeat pattern_repeat_count_req times.
-
-    Hence, the pseudocode is:
-      1. Get the reduced move id for the input move index.
-      2. Loop through (Loop1) the previous occurrences of the reduced move id,
-         starting from the last one till the nth one.
-      3. For the ith cycle of Loop1:
-         Assume the ith previous occurrence of the rmi is the 1st move of the pattern.
-      4. Determine the length of the pattern:
-         The distance from the ith previous occurrence to the input move minus 1.
-      5. Run another loop (Loop2) with the range of the input pattern repeat requirement.
-      6. For the jth cycle of Loop2:
-         Run another loop (Loop3) with a range of pattern length.
-      7. For the kth cycle of Loop3:
-         Inspect the reduced and the full move ids to see whether a pattern exists.
-      8. Return the pattern move indices if found, otherwise return None.
-    
-    The above pseudocode involves three loops.
-    The 1st loop is handled by this function.
-    The 2nd loop is handled by inspect_pattern_repeated_req function.
-    The 3rd loop is handled by inspect_pattern_once function.
+    Parameters:
+      pattern_repeat_count_req: int
+        The required number of repeats for a pattern to be accepted
+    """
+    self.pattern_repeat_count_req = int(pattern_repeat_count_req)
+    self.window_start = 1
+    self.window_limit = PERIOD_DETECTOR_WINDOW_MIN
+    self.symbols = []
+    self.prefixes = []
 
-  Modifies:
-    None
+  def push(self, symbols, move_index_start):
+    """
+    Description:
+      Consumes the symbols of the consecutive moves
+      until a pattern is detected.
+
+    Parameters:
+      symbols: list[int]
+        The symbols of the moves (see the class docstring)
+      move_index_start: int
+        The move index of the 1st input symbol
+
+    Returns:
+      move_index_pattern_start: int
+        The move index where the last repeat of the pattern starts
+        None if no pattern is detected
+      move_index_pattern_end: int
+        The move index where the last repeat of the pattern ends
+        None if no pattern is detected
+
+    Modifies:
+      The attributes of the detector
+    """
+    pattern_repeat_count_req = self.pattern_repeat_count_req
+    window_symbols = self.symbols
+    prefixes = self.prefixes
+    for move_index, symbol in enumerate(symbols, move_index_start):
+      # Extend the prefix function of KMP by the symbol
+      prefix = prefixes[-1] if prefixes else 0
+      while prefix and window_symbols[prefix] != symbol:
+        prefix = prefixes[prefix - 1]
+      if window_symbols and window_symbols[prefix] == symbol:
+        prefix += 1
+      window_symbols.append(symbol)
+      prefixes.append(prefix)
+  
+      # The smallest period of the window must repeat n times
+      # for a window not shorter than the minimum length
+      window_length = len(window_symbols)
+      pattern_length = window_length - prefix
+      if (window_length >= PERIOD_DETECTOR_WINDOW_MIN and
+          window_length >= pattern_repeat_count_req * pattern_length):
+        move_index_pattern_start = move_index - pattern_length + 1
+        return move_index_pattern_start, move_index
+  
+      # Restart the window
+      if window_length == self.window_limit:
+        self.window_start = move_index + 1
+        self.window_limit *= 2
+        window_symbols.clear()
+        prefixes.clear()
+  
+    return None, None
+
+class HighwayPattern:
   """
-  # Get the current move id
-  move_id_reduced = MOVE_INDEX_TO_ID_REDUCED[current_move_index]
-  
-  # Loop through the previous occurrences of the input move id,
-  # starting from the last one till the 1st one: range(last, 1st, -1)
-  range_ = range(
-    MOVE_ID_TO_REDUCED_OCCURRENCE[move_id_reduced] - 1,
-    pattern_repeat_count_req,
-    -1)
-  for pattern_move_id_count in range_:
-    # Assume the ith previous occurrence is the 1st move of the pattern
-    pattern_start_move_index_ith = MOVE_ID_TO_REDUCED_INDEX[
-      move_id_reduced,
-      pattern_move_id_count]
-  
-    # Determine the length of the pattern:
-    # The distance from the ith previous occurrence to the input move minus 1
-    pattern_length = current_move_index - pattern_start_move_index_ith
-  
-    # Inspect if there exist enough moves for pattern inspection
-    pattern_start_move_index_1st = (
-      pattern_start_move_index_ith -
-      pattern_length * (pattern_repeat_count_req + 1))
-    if pattern_start_move_index_1st < 1:
-      return None, None
-  
-    # Return the pattern move indices if the pattern requirements are satisfied
-    if inspect_pattern_repeated_req(
-        pattern_repeat_count_req,
-        pattern_length,
-        pattern_start_move_index_ith):
-      return pattern_start_move_index_ith, pattern_start_move_index_ith + pattern_length - 1
-  
-  # The current move index does not satisfy the pattern requirements
-  return None, None
+  Description:
+    The black cell counts of a travel with a detected highway pattern
+    for any number of moves (N).
+  
+    Consider the pattern starting at the move index s with the length P.
+    Let B(N) be the black cell count after N moves:
+      N <= s: B(N) is stored (the arbitrary region)
+      N > s: B(N) = B(s + r) + q * D
+      where q, r = divmod(N - s, P) and D = B(s + P) - B(s) (the delta per pattern repeat)
+    Hence, B(N) is determined by the stored counts B(0), ..., B(s + P)
+    in O(1) time for each N.
+  
+    The counts are determined by the integer arithmetic:
+      By int64 arrays if the counts fit in int64,
+      By object arrays of python ints otherwise (e.g. N beyond 2 ^ 64).
+    Hence, the counts are exact for any N.
 
-def perform_limited_travel(
-    initials,
-    travel_move_count_limit,
-    pattern_detection_start_move_index,
-    pattern_detection_range,
-    pattern_repeat_count_req):
+  Attributes:
+    move_index_pattern_start: int
+      The move index where the pattern starts formation (s)
+    pattern_length: int
+      The number of the moves of the pattern (P)
+    black_counts: np.ndarray
+      The black cell counts after 0, 1, ..., s + P moves (int64)
+    black_count_delta: int
+      The change of the black cell count for a pattern repeat (D)
+  """
+  __slots__ = (
+    'move_index_pattern_start',
+    'pattern_length',
+    'black_counts',
+    'black_count_delta')
+
+  def __init__(self, move_index_to_black_count, move_index_pattern_start, move_index_pattern_end):
+    """
+    Description:
+      Captures the counts of the arbitrary region and a pattern repeat.
+
+    Parameters:
+      move_index_to_black_count: np.ndarray
+        The number of the black cells after each move (see AntSimulation)
+      move_index_pattern_start: int
+        The move index where the pattern starts formation
+      move_index_pattern_end: int
+        The move index where the pattern ends for a single pattern repeat
+    """
+    self.move_index_pattern_start = int(move_index_pattern_start)
+    self.pattern_length = int(move_index_pattern_end) - self.move_index_pattern_start + 1
+    self.black_counts = np.concatenate((
+      np.zeros(1, dtype=np.int64),
+      move_index_to_black_count[:int(move_index_pattern_end) + 1].astype(np.int64)))
+    self.black_count_delta = int(
+      self.black_counts[-1] - self.black_counts[self.move_index_pattern_start])
+
+  def get_black_count(self, move_counts):
+    """
+    Description:
+      Returns the black cell counts after the input numbers of moves
+      (see the class docstring).
+
+    Parameters:
+      move_counts: int or array-like of int
+        The numbers of the moves (N): nonnegative integers of any size
+
+    Returns:
+      int: The black cell count if move_counts is a scalar
+      np.ndarray: The black cell counts otherwise
+        (int64 if the counts fit in int64, python ints of dtype object otherwise)
+
+    Raises:
+      TypeError: If the numbers of the moves are not integers
+      ValueError: If a number of the moves is negative
+
+    Modifies:
+      None
+    """
+    # The scalars are processed as the arrays of a single element.
+    # numpy converts the python ints mixing int64 and uint64 ranges to floats:
+    # Keep the python ints instead (the floats are rejected below).
+    if not isinstance(move_counts, np.ndarray):
+      move_count_array = np.asarray(move_counts)
+      if move_count_array.dtype.kind == 'f':
+        move_count_array = np.asarray(move_counts, dtype=object)
+      move_counts = move_count_array
+    is_scalar = move_counts.ndim == 0
+    move_counts = np.atleast_1d(move_counts)
+    if move_counts.size == 0:
+      return np.zeros(move_counts.shape, dtype=np.int64)
+    if move_counts.dtype.kind == 'O':
+      if not all(isinstance(move_count, (int, np.integer)) for move_count in move_counts.flat):
+        raise TypeError('The numbers of the moves must be integers')
+    elif move_counts.dtype.kind not in 'iu':
+      raise TypeError('The numbers of the moves must be integers')
+    if int(move_counts.min()) < 0:
+      raise ValueError('The numbers of the moves must be nonnegative')
+
+    # Use int64 if the counts cannot overflow
+    move_index_pattern_start = self.move_index_pattern_start
+    pattern_length = self.pattern_length
+    move_count_max = int(move_counts.max())
+    black_count_max = (
+      int(np.abs(self.black_counts).max()) +
+      abs(self.black_count_delta) * (move_count_max // pattern_length))
+    if max(move_count_max, black_count_max) < 1 << 63:
+      move_counts = move_counts.astype(np.int64)
+      black_count_delta = np.int64(self.black_count_delta)
+    else:
+      move_counts = move_counts.astype(object)
+      black_count_delta = self.black_count_delta
+
+    # The counts stored for the arbitrary region and a pattern repeat
+    pattern_move_counts = np.maximum(move_counts - move_index_pattern_start, 0)
+    repeat_counts = pattern_move_counts // pattern_length
+    remaining_counts = pattern_move_counts % pattern_length
+    stored_move_counts = np.where(
+      move_counts < move_index_pattern_start,
+      move_counts,
+      move_index_pattern_start + remaining_counts).astype(np.int64)
+    black_counts = self.black_counts[stored_move_counts].astype(move_counts.dtype)
+    black_counts = black_counts + repeat_counts * black_count_delta
+    if is_scalar:
+      return int(black_counts[0])
+    return black_counts
+
+class AntSimulation:
   """
   Description:
-    Performs a travel of the ant in order to detect the highway pattern.
-    The travel is limited as the global arrays are static.
+    A travel of a single ant with its own grid and move arrays.
+    The simulations are independent of each other.
+    Hence, any number of simulations can be run in a process
+    (e.g. by main or by the parameter sweep in PE_P349_LangtonsAnt_sweep).
+  
+    The travel methods (perform_limited_travel, perform_online_travel and
+    perform_autocorrelation_travel) run the pattern detection from the 1st move.
+    The moves already stored in the arrays (e.g. by AntBatch) are not repeated:
+    The ant is moved only when the detection passes the last move.
+
+  Attributes:
+    rule: TurmiteRule
+      The rule of the ant (Langton's ant by default)
+    grid_cell_colors: dict:
+      The colors of the cells of the grid in tiles allocated on demand:
+      grid_cell_colors[(i_row >> GRID_TILE_BITS, i_clm >> GRID_TILE_BITS)]: bytearray:
+      The byte (i_row & GRID_TILE_MASK) << GRID_TILE_BITS | (i_clm & GRID_TILE_MASK)
+      of the tile is the colour of the cell
+      The rows and the columns are not bounded (negative values included)
+    move_index_to_id_reduced: np.ndarray:
+      The reduced move ids indexed by the move indices
+      (uint8, or uint16 if the rule has more than 256 reduced move ids)
+      See get_move_ids for the definition of the reduced move id
+    move_index_to_id_full: np.ndarray:
+      The full move ids indexed by the move indices (int64)
+      See get_move_ids for the definition of the full move id
+    move_id_to_reduced_occurrence: np.ndarray:
+      The number of the occurrences of each reduced move id during the travel (int64)
+      One of the values in the range: [0, the move count]
+    move_id_to_reduced_index: np.ndarray:
+      The move indices indexed by the reduced move id and the occurrence of it (int64):
+      move_id_to_reduced_index[move_id_reduced, i_occurrence]:
+      The index of the move corresponding to the ith occurrence of move_id_reduced
+      (the occurrences are stored starting from 1)
+    move_index_to_black_count: np.ndarray:
+      The number of the black (nonzero colour) cells after each move (int64)
+    row: int
+      The grid location of the ant in x-direction
+    clm: int
+      The grid location of the ant in y-direction
+    state: int
+      The state of the ant (see TurmiteRule)
+    dir_id: int
+      The direction of the ant: 0 (N), 1 (E), 2 (W) or 3 (S)
+    black_count: int
+      The number of the black (nonzero colour) cells
+    move_count: int
+      The number of the moves performed
+  """
+  __slots__ = (
+    'rule',
+    'grid_cell_colors',
+    'move_index_to_id_reduced',
+    'move_index_to_id_full',
+    'move_id_to_reduced_occurrence',
+    'move_id_to_reduced_index',
+    'move_index_to_black_count',
+    'row',
+    'clm',
+    'state',
+    'dir_id',
+    'black_count',
+    'move_count')
+
+  def __init__(self, initials, rule=LANGTONS_ANT_RULE):
+    """
+    Description:
+      Creates a simulation with an all-white grid and empty move arrays.
+
+    Parameters:
+      initials: list[]
+        initials[0]: int: Initial row id (not bounded)
+        initials[1]: int: Initial column id (not bounded)
+        initials[2]: np.int8: Initial X-direction
+        initials[3]: np.int8: Initial Y-direction
+        initials[4]: int: Initial state (optional, 0 by default)
+      rule: TurmiteRule or str
+        The rule of the ant (see TurmiteRule)
+    """
+    if not isinstance(rule, TurmiteRule):
+      rule = TurmiteRule(rule)
+    self.rule = rule
+    self.grid_cell_colors = {}
+    self.move_index_to_id_reduced = np.zeros(
+      ARRAY_SIZE_MOVE_INDEX, dtype=np.min_scalar_type(rule.move_id_count - 1))
+    self.move_index_to_id_full = np.zeros(ARRAY_SIZE_MOVE_INDEX, dtype=np.int64)
+    self.move_id_to_reduced_occurrence = np.zeros(rule.move_id_count, dtype=np.int64)
+    self.move_id_to_reduced_index = np.zeros(
+      (rule.move_id_count, ARRAY_SIZE_MOVE_INDEX // rule.move_id_count + 1),
+      dtype=np.int64)
+    self.move_index_to_black_count = np.zeros(ARRAY_SIZE_MOVE_INDEX, dtype=np.int64)
+    self.row = int(initials[0])
+    self.clm = int(initials[1])
+    self.state = int(initials[4]) if len(initials) > 4 else 0
+    self.dir_id = get_dir_id(initials[2], initials[3])
+    self.black_count = 0
+    self.move_count = 0
+
+  def get_cell_color(self, row, clm):
+    """
+    Description:
+      Returns the colour of a cell of the grid.
+      The cells in the tiles not allocated yet are white (0).
+  
+    Parameters:
+      row: int
+        The grid location in x-direction
+      clm: int
+        The grid location in y-direction
+  
+    Returns:
+      int: The colour of the cell
+  
+    Modifies:
+      None
+    """
+    tile = self.grid_cell_colors.get((row >> GRID_TILE_BITS, clm >> GRID_TILE_BITS))
+    if tile is None:
+      return 0
+  
+    cell = ((row & GRID_TILE_MASK) << GRID_TILE_BITS) | (clm & GRID_TILE_MASK)
+    return tile[cell]
+
+  def inspect_pattern_once(
+      self,
+      pattern_length,
+      pattern_start_move_index_ith,
+      pattern_start_move_index_jth):
+    """
+    Description:
+      Performs the inspections involved in the 3rd loop
+      described in the docstring of detect_pattern method.
+
+      Consider two sequences of moves with the same length (pattern_length):
+        1. Starting from pattern_start_move_index_ith
+        2. Starting from pattern_start_move_index_jth
+
+      Inspects all corresponding moves from the two sequences
+      whether they satisfy the following pattern requirements:
+        1. The cell colour must be the same
+        2. The row-wise shift must be the same
+        3. The clm-wise shift must be the same
+      The above checks can be performed using move_index_to_id_full
+      as it contains all the three information:
+      The differences of the corresponding full move ids must be the same.
+      The differences are compared by a single array comparison.
+
+    Parameters:
+      pattern_length: int
+        The length of the inspected pattern
+      pattern_start_move_index_ith: int
+        The move index where the inspected pattern starts
+      pattern_start_move_index_jth: int
+        The move index where the inspected pattern repeat starts
+
+    Returns:
+      bool: True if a pattern repeats once
+
+    Modifies:
+      None
+    """
+    # The differences between the corresponding pattern move ids must be the same
+    move_ids_full = self.move_index_to_id_full
+    diffs_full = (
+      move_ids_full[
+        pattern_start_move_index_ith:pattern_start_move_index_ith + pattern_length] -
+      move_ids_full[
+        pattern_start_move_index_jth:pattern_start_move_index_jth + pattern_length])
+    return bool((diffs_full == diffs_full[0]).all())
+
+  def inspect_pattern_repeated_req(
+      self,
+      pattern_repeat_count_req,
+      pattern_length,
+      pattern_start_move_index_ith):
+    """
+    Description:
+      Performs the inspections involved in the 2nd loop
+      described in the docstring of detect_pattern method.
+      Inspects the reduced and the full move ids to check whether a sequence of the 
+      pattern_length number of moves starting at the ith move index repeats n times.
+  
+      The nearest repeat is inspected first as most of the candidates fail there.
+      Then, all repeats are inspected by a single array comparison:
+      The moves from the nth repeat to the ith move index are viewed as
+      a (n + 1) x pattern_length array (a row per repeat)
+      and the differences of the last row with the other rows
+      must be constant along the rows.
+
+    Parameters:
+      pattern_repeat_count_req: int
+        The required number of repeats for a pattern to be accepted
+      pattern_length: int
+        The length of the inspected pattern
+      pattern_start_move_index_ith: int
+        The move index where the inspected pattern starts
+
+    Returns:
+      bool: True if a pattern repeats for pattern_repeat_count_req
+
+    Modifies:
+      None
+    """
+    # Inspect the nearest repeat
+    if not self.inspect_pattern_once(
+        pattern_length,
+        pattern_start_move_index_ith,
+        pattern_start_move_index_ith - pattern_length):
+      return False
+
+    # Inspect all repeats: a row per repeat
+    repeats = self.move_index_to_id_full[
+      pattern_start_move_index_ith - pattern_length * pattern_repeat_count_req:
+      pattern_start_move_index_ith + pattern_length].reshape(
+        pattern_repeat_count_req + 1, pattern_length)
+    diffs_full = repeats[-1] - repeats[:-1]
+    return bool((diffs_full == diffs_full[:, :1]).all())
+
+  def detect_pattern(self, current_move_index, pattern_repeat_count_req):
+    """
+    Description:
+      Let's assume that the current move is the kth occurrence of
+      the reduced move id (rmi) corresponding to the input move id.
+      The method applies an optimized KMP in order to detect
+      whether a pattern exists starting from the rmi.
+      The optimized KMP examines the occurances of the rmis instead of inspecting the rmis.
+      The pattern requirement is achieved when
+      the sequence of the occurances repeats n times periodically.
+      See Nomenclature section of the module docstring for the definition of n.
+
+    Parameters:
+      current_move_index: int
+        The index of the current move
+      pattern_repeat_count_req: int
+        The required number of repeats for a pattern to be accepted
+
+    Returns:
+      move_index_pattern_start: int
+        The move index where the pattern starts formation
+      move_index_pattern_end: int
+        The move index where the pattern ends
+
+    Method:
+      The method is an optimized KMP method based on the occurrences of the reduced move ids.
+      Consider the reduced move ids as letters (a, b, c, ...).
+      Consider the sequence of reduced move ids as a string: ...abacadabacadabacada
+      Consider "a" is the reduced move id corresponding to the input move.
+      As you can see, abacad is the pattern we are looking for,
+      but in that pattern, "a" is repeated many times.
+      Consider, the last "a" is the kth occurrence of "a".
+      The method inspects the (k-1)th, (k-2)th, ... nth occurrences of "a"
+      if any satisfies the pattern rules.
+      For the above example (...abacadabacadabacada):
+        (k-1)th: Fail: the current sequence is 'ad' while the previous sequence is 'ac'
+        (k-2)th: Fail: the current sequence is 'acad' while the previous sequence is 'adab'
+        (k-3)th: Success: both the current and the previous sequences are 'abacad'
+      The sequence shall repeat pattern_repeat_count_req times.
+
+      Hence, the pseudocode is:
+        1. Get the reduced move id for the input move index.
+        2. Loop through (Loop1) the previous occurrences of the reduced move id,
+           starting from the last one till the nth one.
+        3. For the ith cycle of Loop1:
+           Assume the ith previous occurrence of the rmi is the 1st move of the pattern.
+        4. Determine the length of the pattern:
+           The distance from the ith previous occurrence to the input move minus 1.
+        5. Run another loop (Loop2) with the range of the input pattern repeat requirement.
+        6. For the jth cycle of Loop2:
+           Run another loop (Loop3) with a range of pattern length.
+        7. For the kth cycle of Loop3:
+           Inspect the reduced and the full move ids to see whether a pattern exists.
+        8. Return the pattern move indices if found, otherwise return None.
+    
+      The above pseudocode involves three loops.
+      The 1st loop is handled by this method.
+      The 2nd loop is handled by inspect_pattern_repeated_req method.
+      The 3rd loop is handled by inspect_pattern_once method.
+      The 2nd and the 3rd loops are performed by array comparisons.
+
+    Modifies:
+      None
+    """
+    # Get the current move id
+    # (the indices are used as python ints to prevent overflows of the array dtypes)
+    current_move_index = int(current_move_index)
+    move_id_reduced = self.move_index_to_id_reduced[current_move_index]
+    pattern_repeat_count_req = int(pattern_repeat_count_req)
+  
+    # Loop through the previous occurrences of the input move id,
+    # starting from the last one till the 1st one: range(last, 1st, -1)
+    range_ = range(
+      int(self.move_id_to_reduced_occurrence[move_id_reduced]) - 1,
+      pattern_repeat_count_req,
+      -1)
+    for pattern_move_id_count in range_:
+      # Assume the ith previous occurrence is the 1st move of the pattern
+      pattern_start_move_index_ith = int(self.move_id_to_reduced_index[
+        move_id_reduced,
+        pattern_move_id_count])
+  
+      # Determine the length of the pattern:
+      # The distance from the ith previous occurrence to the input move minus 1
+      pattern_length = current_move_index - pattern_start_move_index_ith
+  
+      # Inspect if there exist enough moves for pattern inspection
+      pattern_start_move_index_1st = (
+        pattern_start_move_index_ith -
+        pattern_length * (pattern_repeat_count_req + 1))
+      if pattern_start_move_index_1st < 1:
+        return None, None
+  
+      # Return the pattern move indices if the pattern requirements are satisfied
+      if self.inspect_pattern_repeated_req(
+          pattern_repeat_count_req,
+          pattern_length,
+          pattern_start_move_index_ith):
+        return pattern_start_move_index_ith, pattern_start_move_index_ith + pattern_length - 1
+  
+    # The current move index does not satisfy the pattern requirements
+    return None, None
+
+  def reserve_move_arrays(self, move_count, occurrence_count):
+    """
+    Description:
+      Ensures the arrays indexed by the move indices
+      can store the input number of moves and occurrences.
+      The arrays are grown geometrically (at least doubled)
+      so that the cost of the copies is amortized constant per move.
+
+    Parameters:
+      move_count: int
+        The number of the moves to store
+      occurrence_count: int
+        The max number of the occurrences of a reduced move id to store
+
+    Returns:
+      None
+
+    Modifies:
+      move_index_to_id_reduced
+      move_index_to_id_full
+      move_id_to_reduced_index
+      move_index_to_black_count
+    """
+    move_array_size = self.move_index_to_id_reduced.size
+    if move_count > move_array_size:
+      move_array_size = max(move_count, 2 * move_array_size)
+      self.move_index_to_id_reduced = grow_array(
+        self.move_index_to_id_reduced, move_array_size)
+      self.move_index_to_id_full = grow_array(
+        self.move_index_to_id_full, move_array_size)
+      self.move_index_to_black_count = grow_array(
+        self.move_index_to_black_count, move_array_size)
+
+    # The occurrences are stored starting from 1
+    occurrence_array_size = self.move_id_to_reduced_index.shape[1]
+    if occurrence_count + 1 > occurrence_array_size:
+      self.move_id_to_reduced_index = grow_array(
+        self.move_id_to_reduced_index,
+        max(occurrence_count + 1, 2 * occurrence_array_size),
+        axis=1)
+
+  def get_move_symbols(self, move_index_start, move_index_end):
+    """
+    Description:
+      Returns the symbols of the moves in the range [move_index_start, move_index_end):
+        M * (the full move id - the previous full move id) + the reduced move id
+      where M is the number of the reduced move ids of the rule.
+      The symbol contains the reduced move id and the shift in the grid.
+      Hence, a periodic sequence of symbols is a pattern
+      satisfying the requirements of inspect_pattern_once.
+
+    Parameters:
+      move_index_start: int
+        The index of the 1st move (at least 1 as the 1st move has no symbol)
+      move_index_end: int
+        The index after the last move
+
+    Returns:
+      np.ndarray: The symbols of the moves (int64)
+
+    Modifies:
+      None
+    """
+    return (
+      self.rule.move_id_count *
+      np.diff(self.move_index_to_id_full[move_index_start - 1:move_index_end]) +
+      self.move_index_to_id_reduced[move_index_start:move_index_end])
+
+  def detect_pattern_autocorrelation(
+      self,
+      move_index_end,
+      pattern_repeat_count_req,
+      window_length=AUTOCORRELATION_WINDOW_LENGTH,
+      candidate_count=AUTOCORRELATION_CANDIDATE_COUNT):
+    """
+    Description:
+      The batch pattern detection for the trailing window of the travel.
+      The pattern lengths are ranked by the autocorrelation of the symbols
+      in the window (see find_pattern_candidates)
+      and only the strongest lags are verified exactly:
+      The last max(n * L, L + AUTOCORRELATION_VERIFICATION_LENGTH_MIN) symbols
+      must repeat with the length L.
+      See Nomenclature section of the module docstring for the definition of n.
+  
+      The 1st term requires n repeats of the pattern.
+      The 2nd term requires AUTOCORRELATION_VERIFICATION_LENGTH_MIN equal symbol pairs
+      in order to reject the fake patterns of the arbitrary region
+      (i.e. the fake patterns repeat many times for a short lag
+      but do not hold for a long portion of the travel).
+      Hence, the highway pattern is detected
+      AUTOCORRELATION_VERIFICATION_LENGTH_MIN + L moves after it starts at least.
+  
+      The time complexity is O(W log W) for a window of W moves
+      while the candidates of detect_pattern are all previous occurrences
+      of the reduced move id.
+
+    Parameters:
+      move_index_end: int
+        The index after the last move of the travel
+      pattern_repeat_count_req: int
+        The required number of repeats for a pattern to be accepted
+      window_length: int
+        The number of the trailing moves inspected
+      candidate_count: int
+        The number of the strongest lags verified
+
+    Returns:
+      move_index_pattern_start: int
+        The move index where the last repeat of the pattern starts
+        None if no pattern is detected
+      move_index_pattern_end: int
+        The move index where the last repeat of the pattern ends
+        None if no pattern is detected
+
+    Modifies:
+      None
+    """
+    pattern_repeat_count_req = int(pattern_repeat_count_req)
+    symbols = self.get_move_symbols(
+      max(move_index_end - window_length, 1), move_index_end)
+    pattern_length_max = min(
+      symbols.size // pattern_repeat_count_req,
+      symbols.size - AUTOCORRELATION_VERIFICATION_LENGTH_MIN)
+    if pattern_length_max <= 0:
+      return None, None
+
+    for pattern_length in find_pattern_candidates(
+        symbols, pattern_length_max, candidate_count).tolist():
+      verification_length = max(
+        pattern_repeat_count_req * pattern_length,
+        pattern_length + AUTOCORRELATION_VERIFICATION_LENGTH_MIN)
+      pattern_symbols = symbols[symbols.size - verification_length:]
+      if np.array_equal(pattern_symbols[pattern_length:], pattern_symbols[:-pattern_length]):
+        return move_index_end - pattern_length, move_index_end - 1
+
+    return None, None
+
+  def perform_travel_chunk(self, move_index_end):
+    """
+    Description:
+      Performs the moves of the ant from the last move till move_index_end.
+      Does nothing if the moves are already performed.
+      The ant state is kept in plain ints:
+        The grid location inside the current tile and the tile,
+        The state and the direction (state * 4 + dir_id),
+        The grid location key defining the full move id (see get_move_ids).
+      The written colour, the next state and direction and the grid location change
+      are looked up by the reduced move id (i.e. by the colour, the state and the direction)
+      in the tables of the rule (see TurmiteRule).
+      The tile is looked up (or allocated) only when the ant leaves the current tile.
+  
+      The move ids and the black cell counts are collected for the chunk
+      and written to the arrays at the end of the chunk (see store_moves).
+
+    Parameters:
+      move_index_end: int
+        The index after the last move of the chunk
+
+    Returns:
+      None
+
+    Modifies:
+      The attributes of the simulation
+    """
+    if move_index_end <= self.move_count:
+      return
+
+    # Local references for the loop
+    rule = self.rule
+    tiles = self.grid_cell_colors
+    colors_next = rule.move_id_to_color
+    state_dirs_next = rule.move_id_to_state_dir
+    row_deltas = rule.move_id_to_row_delta
+    clm_deltas = rule.move_id_to_clm_delta
+    location_deltas = rule.move_id_to_location_delta
+    black_count_deltas = rule.move_id_to_nonzero_delta
+    color_stride = 4 * rule.state_count
+    move_id_count = rule.move_id_count
+    tile_bits = GRID_TILE_BITS
+    tile_mask = GRID_TILE_MASK
+    move_index_start = self.move_count
+    state_dir = 4 * self.state + self.dir_id
+    black_count = self.black_count
+    move_ids_reduced = []
+    move_ids_full = []
+    black_counts = []
+    append_reduced = move_ids_reduced.append
+    append_full = move_ids_full.append
+    append_black_count = black_counts.append
+
+    # Split the grid location into the tile and the location inside the tile
+    tile_row = self.row >> tile_bits
+    tile_clm = self.clm >> tile_bits
+    local_row = self.row & tile_mask
+    local_clm = self.clm & tile_mask
+    tile = tiles.get((tile_row, tile_clm))
+    if tile is None:
+      tile = tiles[(tile_row, tile_clm)] = bytearray(GRID_TILE_BYTE_COUNT)
+    location = (self.row << MOVE_ID_FULL_ROW_BITS) + self.clm
+
+    for _ in range(move_index_start, move_index_end):
+      # Get the move ids before moving the ant
+      cell = (local_row << tile_bits) | local_clm
+      move_id_reduced = tile[cell] * color_stride + state_dir
+      append_reduced(move_id_reduced)
+      append_full(move_id_count * location + move_id_reduced)
+  
+      # Write the cell colour
+      tile[cell] = colors_next[move_id_reduced]
+      black_count += black_count_deltas[move_id_reduced]
+      append_black_count(black_count)
+  
+      # Move the ant
+      state_dir = state_dirs_next[move_id_reduced]
+      local_row += row_deltas[move_id_reduced]
+      local_clm += clm_deltas[move_id_reduced]
+      location += location_deltas[move_id_reduced]
+  
+      # Switch the tile if the ant left the current tile
+      if (local_row | local_clm) >> tile_bits:
+        tile_row += local_row >> tile_bits
+        tile_clm += local_clm >> tile_bits
+        local_row &= tile_mask
+        local_clm &= tile_mask
+        tile = tiles.get((tile_row, tile_clm))
+        if tile is None:
+          tile = tiles[(tile_row, tile_clm)] = bytearray(GRID_TILE_BYTE_COUNT)
+
+    self.store_moves(move_ids_reduced, move_ids_full, black_counts)
+    self.row = (tile_row << tile_bits) + local_row
+    self.clm = (tile_clm << tile_bits) + local_clm
+    self.state = state_dir >> 2
+    self.dir_id = state_dir & 3
+    self.black_count = black_count
+
+  def store_moves(self, move_ids_reduced, move_ids_full, black_counts):
+    """
+    Description:
+      Appends the consecutive moves after the last move to the arrays
+      (grown if required).
+      The ant state (the grid and the ant location) is not modified.
+  
+      The occurrence of a move in the chunk is the number of the previous occurrences
+      of its reduced move id plus its rank among the moves with the same reduced move id
+      (determined by a stable sort of the chunk).
+
+    Parameters:
+      move_ids_reduced: list[int] or np.ndarray
+        The reduced move ids (see get_move_ids)
+      move_ids_full: list[int] or np.ndarray
+        The full move ids (see get_move_ids)
+      black_counts: list[int] or np.ndarray
+        The number of the black cells after each move
+
+    Returns:
+      None
+
+    Modifies:
+      move_index_to_id_reduced
+      move_index_to_id_full
+      move_id_to_reduced_occurrence
+      move_id_to_reduced_index
+      move_index_to_black_count
+      move_count
+    """
+    move_index_start = self.move_count
+    chunk_ids_reduced = np.asarray(
+      move_ids_reduced, dtype=self.move_index_to_id_reduced.dtype)
+    move_index_end = move_index_start + chunk_ids_reduced.size
+    chunk_occurrence_counts = np.bincount(
+      chunk_ids_reduced, minlength=self.rule.move_id_count)
+    occurrence_counts = self.move_id_to_reduced_occurrence + chunk_occurrence_counts
+    self.reserve_move_arrays(move_index_end, int(occurrence_counts.max()))
+    chunk = slice(move_index_start, move_index_end)
+    self.move_index_to_id_reduced[chunk] = chunk_ids_reduced
+    self.move_index_to_id_full[chunk] = move_ids_full
+    self.move_index_to_black_count[chunk] = black_counts
+  
+    # The occurrences are stored starting from 1
+    chunk_move_indices = np.argsort(chunk_ids_reduced, kind='stable')
+    chunk_ids_sorted = chunk_ids_reduced[chunk_move_indices]
+    chunk_ranks = (
+      np.arange(chunk_ids_sorted.size) -
+      (np.cumsum(chunk_occurrence_counts) - chunk_occurrence_counts)[chunk_ids_sorted])
+    self.move_id_to_reduced_index[
+      chunk_ids_sorted,
+      self.move_id_to_reduced_occurrence[chunk_ids_sorted] + 1 + chunk_ranks] = (
+        chunk_move_indices + move_index_start)
+    self.move_id_to_reduced_occurrence[:] = occurrence_counts
+    self.move_count = move_index_end
+
+  def perform_limited_travel(
+      self,
+      travel_move_count_limit,
+      pattern_detection_start_move_index,
+      pattern_detection_range,
+      pattern_repeat_count_req):
+    """
+    Description:
+      Performs a travel of the ant in order to detect the highway pattern.
+      The travel is limited to prevent an infinite loop.
   
-    Starts executing the pattern detection after (P1)th move.
+      Starts executing the pattern detection after (P1)th move.
   
-    P1 is used to delay the pattern detection
-    to skip the arbitrary travel region.
+      P1 is used to delay the pattern detection
+      to skip the arbitrary travel region.
   
-    See Nomenclature section of the module docstring for the definition of P1.
+      See Nomenclature section of the module docstring for the definition of P1.
   
-    Fills the global arrays during the travel.
+      Fills the arrays of the simulation during the travel.
 
-  Parameters:
-    initials: list[]
-      initials[0]: np.uint16: Initial row id
-      initials[1]: np.uint16: Initial column id
-      initials[2]: np.int8: Initial X-direction
-      initials[3]: np.int8: Initial Y-direction
-    travel_move_count_limit: np.uint16
-      A limit value for the move count in order to prevent an infinite loop
-      in case of a failure in the pattern detection procedure.
-    pattern_detection_start_move_index: np.uint16
-      This variable is used to delay the pattern detection.
-    pattern_detection_range: np.uint16
-      Perform pattern detection after pattern_detection_start_move_index
-      in every pattern_detection_range moves.
-      See module docstring Time Complexity section
-    pattern_repeat_count_req: np.uint8
-      The required number of repeats for a pattern to be accepted
+    Parameters:
+      travel_move_count_limit: int
+        A limit value for the move count in order to prevent an infinite loop
+        in case of a failure in the pattern detection procedure.
+      pattern_detection_start_move_index: int
+        This variable is used to delay the pattern detection.
+      pattern_detection_range: int
+        Perform pattern detection after pattern_detection_start_move_index
+        in every pattern_detection_range moves.
+        See module docstring Time Complexity section
+      pattern_repeat_count_req: int
+        The required number of repeats for a pattern to be accepted
 
-  Returns:
-    move_index_pattern_start: uint16
-      The move index where the pattern starts formation
-    move_index_pattern_end: uint16
-      The move index where the pattern ends
+    Returns:
+      move_index_pattern_start: int
+        The move index where the pattern starts formation
+      move_index_pattern_end: int
+        The move index where the pattern ends
 
-  Modifies:
-    The global variables are initialized right after the module docstring:
-      GRID_CELL_COLORS
-      MOVE_INDEX_TO_ID_REDUCED
-      MOVE_INDEX_TO_ID_FULL
-      MOVE_ID_TO_REDUCED_OCCURRENCE
-      MOVE_ID_TO_REDUCED_INDEX
-      MOVE_INDEX_TO_BLACK_COUNT
-  """
-  # Initialize the travel
-  row = initials[0]
-  clm = initials[1]
-  dir_x = initials[2]
-  dir_y = initials[3]
-  black_count = 0
-
-  # Run the ant until the pattern is detected
-  pattern_detection_counter = 0
-  for move_index in range(travel_move_count_limit):
-    # Flip the cell colour
-    GRID_CELL_COLORS[row][clm] = not GRID_CELL_COLORS[row][clm]
-    if GRID_CELL_COLORS[row][clm]:
-      black_count += 1
-    else:
-      black_count -= 1
-  
-    # Get the move ids before moving the ant
-    move_id_reduced, move_id_full = get_move_ids(
-      GRID_CELL_COLORS[row][clm], dir_x, dir_y, row, clm)
-  
-    # Fill the global arrays
-    MOVE_INDEX_TO_ID_REDUCED[move_index] = move_id_reduced
-    MOVE_INDEX_TO_ID_FULL[move_index] = move_id_full
-    MOVE_INDEX_TO_BLACK_COUNT[move_index] = black_count
-    MOVE_ID_TO_REDUCED_OCCURRENCE[move_id_reduced] += 1
-    MOVE_ID_TO_REDUCED_INDEX[
-      move_id_reduced,
-      MOVE_ID_TO_REDUCED_OCCURRENCE[move_id_reduced]] = move_index
-  
-    # Inspect if the pattern with the required repeat count is detected
-    if (
-        move_index >= pattern_detection_start_move_index and
-        pattern_detection_counter == 0):
-      move_index_pattern_start, move_index_pattern_end = detect_pattern(
-        move_index, pattern_repeat_count_req)
+    Modifies:
+      The attributes of the simulation
+    """
+    travel_move_count_limit = int(travel_move_count_limit)
+    pattern_detection_start_move_index = int(pattern_detection_start_move_index)
+    pattern_detection_range = int(pattern_detection_range)
+
+    # Run the ant in chunks ending at the moves inspected by the pattern detection:
+    # The moves with index >= P1 and index % w == 0
+    move_index = 0
+    while move_index < travel_move_count_limit:
+      detection_move_index = max(move_index, pattern_detection_start_move_index)
+      detection_move_index += (-detection_move_index) % pattern_detection_range
+      move_index = min(
+        move_index + TRAVEL_CHUNK_SIZE,
+        detection_move_index + 1,
+        travel_move_count_limit)
+      self.perform_travel_chunk(move_index)
+  
+      # Inspect if the pattern with the required repeat count is detected
+      if move_index - 1 == detection_move_index:
+        move_index_pattern_start, move_index_pattern_end = self.detect_pattern(
+          detection_move_index, pattern_repeat_count_req)
+        if move_index_pattern_start is not None:
+          return move_index_pattern_start, move_index_pattern_end
+  
+    # Pattern detection has failed
+    return None, None
+
+  def perform_online_travel(
+      self,
+      travel_move_count_limit,
+      pattern_repeat_count_req):
+    """
+    Description:
+      Performs a travel of the ant in order to detect the highway pattern
+      with the online pattern detection (see PeriodDetector).
+      The detection is performed on every move from the start of the travel.
+      Hence, the pattern detection does not require P1 and w.
+  
+      Fills the arrays of the simulation during the travel.
+
+    Parameters:
+      travel_move_count_limit: int
+        A limit value for the move count in order to prevent an infinite loop
+        in case of a failure in the pattern detection procedure.
+      pattern_repeat_count_req: int
+        The required number of repeats for a pattern to be accepted
+
+    Returns:
+      move_index_pattern_start: int
+        The move index where the pattern starts formation
+      move_index_pattern_end: int
+        The move index where the pattern ends
+
+    Modifies:
+      The attributes of the simulation
+    """
+    travel_move_count_limit = int(travel_move_count_limit)
+    period_detector = PeriodDetector(pattern_repeat_count_req)
+
+    move_index = 0
+    while move_index < travel_move_count_limit:
+      move_index_end = min(move_index + TRAVEL_CHUNK_SIZE, travel_move_count_limit)
+      self.perform_travel_chunk(move_index_end)
+  
+      # Feed the symbols of the moves to the detector (the 1st move has no symbol)
+      symbol_move_index = max(move_index, 1)
+      move_index_pattern_start, move_index_pattern_end = period_detector.push(
+        self.get_move_symbols(symbol_move_index, move_index_end).tolist(),
+        symbol_move_index)
       if move_index_pattern_start is not None:
         return move_index_pattern_start, move_index_pattern_end
+      move_index = move_index_end
   
-    # Move the ant
-    [dir_x, dir_y] = ROTATE_ORIENTATIONS_REDUCED[int(move_id_reduced)]
-    row += dir_x
-    clm += dir_y
+    # Pattern detection has failed
+    return None, None
+
+  def perform_autocorrelation_travel(
+      self,
+      travel_move_count_limit,
+      pattern_repeat_count_req,
+      pattern_detection_range):
+    """
+    Description:
+      Performs a travel of the ant in order to detect the highway pattern
+      with the autocorrelation pattern detection (see detect_pattern_autocorrelation)
+      performed on the trailing window once in every w moves.
+  
+      Fills the arrays of the simulation during the travel.
+
+    Parameters:
+      travel_move_count_limit: int
+        A limit value for the move count in order to prevent an infinite loop
+        in case of a failure in the pattern detection procedure.
+      pattern_repeat_count_req: int
+        The required number of repeats for a pattern to be accepted
+      pattern_detection_range: int
+        Perform pattern detection in every pattern_detection_range moves.
+
+    Returns:
+      move_index_pattern_start: int
+        The move index where the pattern starts formation
+      move_index_pattern_end: int
+        The move index where the pattern ends
+
+    Modifies:
+      The attributes of the simulation
+    """
+    travel_move_count_limit = int(travel_move_count_limit)
+
+    move_index = 0
+    while move_index < travel_move_count_limit:
+      move_index = min(move_index + int(pattern_detection_range), travel_move_count_limit)
+      self.perform_travel_chunk(move_index)
   
-    # Increment the pattern detection counter
-    pattern_detection_counter += 1
-    if pattern_detection_counter == pattern_detection_range:
-      pattern_detection_counter = 0
+      move_index_pattern_start, move_index_pattern_end = (
+        self.detect_pattern_autocorrelation(move_index, pattern_repeat_count_req))
+      if move_index_pattern_start is not None:
+        return move_index_pattern_start, move_index_pattern_end
   
-  # Pattern detection has failed
-  return None, None
+    # Pattern detection has failed
+    return None, None
 
-def determine_black_count(
-    move_count_req,
-    move_index_pattern_start,
-    move_index_pattern_end):
-  """
-  Description:
-    Determines the black cell count for the whole travel of the ant.
+  def determine_black_count(
+      self,
+      move_count_req,
+      move_index_pattern_start,
+      move_index_pattern_end):
+    """
+    Description:
+      Determines the black cell count for the whole travel of the ant.
 
-  Method:
-    The total number of black cells for the whole travel of the ant
-    is the sum of the black cell counts in the arbitrary and highway regions.
+    Method:
+      The total number of black cells for the whole travel of the ant
+      is the sum of the black cell counts in the arbitrary and highway regions.
   
-    The black cells in the highway region can be calculated by...
-    determining the black cells in the repeating pattern.
+      The black cells in the highway region can be calculated by...
+      determining the black cells in the repeating pattern.
     
-    However, the total move count of the highway may not be divided to the
-    repeating pattern move count evenly.
+      However, the total move count of the highway may not be divided to the
+      repeating pattern move count evenly.
     
-    If so, the count of the black cells must be calculated
-    for the remaining moves as well.
-
-  Parameters:
-    move_count_req: np.uint64
-      The move count requirement by Project Euler Problem #349
-    move_index_pattern_start: uint16
-      The move index where the pattern starts formation
-    move_index_pattern_end: uint16
-      The move index where the pattern ends for a single pattern repeat
+      If so, the count of the black cells must be calculated
+      for the remaining moves as well.
   
-  Returns:
-    np.uint64: The total number of the black cells for the whole travel of the ant
-  
-  Modifies:
-    None
+      The counts are determined by the integer arithmetic of HighwayPattern.
+
+    Parameters:
+      move_count_req: int or np.uint64
+        The move count requirement by Project Euler Problem #349
+      move_index_pattern_start: int
+        The move index where the pattern starts formation
+      move_index_pattern_end: int
+        The move index where the pattern ends for a single pattern repeat
+  
+    Returns:
+      int: The total number of the black cells for the whole travel of the ant
+  
+    Modifies:
+      None
+    """
+    return self.get_highway(
+      move_index_pattern_start,
+      move_index_pattern_end).get_black_count(int(move_count_req))
+
+  def get_highway(self, move_index_pattern_start, move_index_pattern_end):
+    """
+    Description:
+      Returns the highway pattern determining the black cell count
+      for any number of moves (see HighwayPattern).
+
+    Parameters:
+      move_index_pattern_start: int
+        The move index where the pattern starts formation
+      move_index_pattern_end: int
+        The move index where the pattern ends for a single pattern repeat
+
+    Returns:
+      HighwayPattern: The highway pattern of the travel
+
+    Modifies:
+      None
+    """
+    return HighwayPattern(
+      self.move_index_to_black_count,
+      move_index_pattern_start,
+      move_index_pattern_end)
+
+  def solve(
+      self,
+      move_count_req,
+      pattern_detection_method,
+      travel_move_count_limit,
+      pattern_detection_start_move_index,
+      pattern_detection_range,
+      pattern_repeat_count_req):
+    """
+    Description:
+      Performs the travel with the input pattern detection method
+      and determines the black cell count for the whole travel of the ant.
+
+    Parameters:
+      move_count_req: int or np.uint64
+        The move count requirement by Project Euler Problem #349
+      pattern_detection_method: str
+        'online': The online pattern detection (see PeriodDetector)
+        'autocorrelation': The autocorrelation pattern detection
+          (see detect_pattern_autocorrelation)
+        'delayed': The delayed pattern detection (see detect_pattern)
+      travel_move_count_limit: int
+        See perform_limited_travel
+      pattern_detection_start_move_index: int
+        See perform_limited_travel (used by the delayed pattern detection)
+      pattern_detection_range: int
+        See perform_limited_travel (not used by the online pattern detection)
+      pattern_repeat_count_req: int
+        The required number of repeats for a pattern to be accepted
+
+    Returns:
+      black_count: int
+        The total number of the black cells for the whole travel of the ant
+        None if the pattern detection has failed
+      move_index_pattern_start: int
+        The move index where the pattern starts formation
+      move_index_pattern_end: int
+        The move index where the pattern ends
+
+    Modifies:
+      The attributes of the simulation
+    """
+    if pattern_detection_method == 'online':
+      move_index_pattern_start, move_index_pattern_end = self.perform_online_travel(
+        travel_move_count_limit,
+        pattern_repeat_count_req)
+    elif pattern_detection_method == 'autocorrelation':
+      move_index_pattern_start, move_index_pattern_end = (
+        self.perform_autocorrelation_travel(
+          travel_move_count_limit,
+          pattern_repeat_count_req,
+          pattern_detection_range))
+    else:
+      move_index_pattern_start, move_index_pattern_end = self.perform_limited_travel(
+        travel_move_count_limit,
+        pattern_detection_start_move_index,
+        pattern_detection_range,
+        pattern_repeat_count_req)
+
+    # The pattern detection has failed
+    if move_index_pattern_start is None:
+      return None, None, None
+
+    # Determine the total number of the black cells for the whole travel of the ant
+    black_count = self.determine_black_count(
+      move_count_req,
+      move_index_pattern_start,
+      move_index_pattern_end)
+    return black_count, move_index_pattern_start, move_index_pattern_end
+
+class AntBatch:
   """
-  # Determine the move indices
-  move_index_arb_start = np.uint64(0)
-  move_index_arb_end = np.uint64(move_index_pattern_start - 1)
-  
-  # Determine the move counts
-  move_count_pattern = np.uint64(
-    move_index_pattern_end - move_index_pattern_start + 1)
-  move_count_arb = np.uint64(move_index_arb_end - move_index_arb_start + 1)
-  move_count_highway = np.uint64(move_count_req - move_count_arb)
-  move_count_remaining = np.uint64(move_count_highway % move_count_pattern)
-  
-  # Determine the black cell counts for the whole travel of the ant
-  black_count_pattern = np.uint64(
-    MOVE_INDEX_TO_BLACK_COUNT[move_index_pattern_end] -
-    MOVE_INDEX_TO_BLACK_COUNT[move_index_pattern_start - 1])
-  black_count_arb = np.uint64(MOVE_INDEX_TO_BLACK_COUNT[move_index_arb_end])
-  black_count_highway = np.uint64(
-    np.uint64((move_count_highway - move_count_remaining) / move_count_pattern) *
-    black_count_pattern)
-  if move_count_remaining == 0:
-    return np.uint64(black_count_arb + black_count_highway)
-  
-  # Determine the move indices for the remaining moves
-  move_index_remaining_start = int(move_index_pattern_start)
-  move_index_remaining_end = (
-    move_index_remaining_start + int(move_count_remaining) - 1)
-  
-  # Determine the black cell count for the remaining moves
-  black_count_remaining = np.uint64(
-    MOVE_INDEX_TO_BLACK_COUNT[move_index_remaining_end] -
-    MOVE_INDEX_TO_BLACK_COUNT[move_index_remaining_start - 1])
-  
-  # Return the total number of the black cells for the whole travel of the ant
-  return np.uint64(black_count_arb + black_count_highway + black_count_remaining)
+  Description:
+    The travels of K ants performed in lockstep:
+    Each iteration moves all ants by a move with a few array operations
+    (the write, the turn and the move are looked up by fancy indexing).
+    Hence, the interpreter overhead of a move is shared by K ants.
+  
+    Each ant travels on its own bounded grid
+    (a square of 2 ^ grid_bits cells centered at the initial location).
+    An ant is retired (i.e. stops moving) when it approaches the border of its grid
+    (see retire_border_ants).
+    The trace of an ant is loaded to a simulation (see get_simulation)
+    which runs the pattern detection of AntSimulation
+    and continues the travel on the unbounded grid if required
+    (e.g. for the retired ants).
+  
+    The batch records only the reduced move ids (the trace).
+    The full move ids and the black cell counts are
+    the cumulative sums of the changes looked up by the reduced move ids.
+    Hence, they are determined only for the ants loaded to the simulations.
+
+  Attributes:
+    initials: list[list[]]
+      The initials of the ants (see AntSimulation)
+    rule: TurmiteRule
+      The rule of the ants
+    grid_bits: int
+      The number of the rows (and columns) of a grid: 2 ^ grid_bits
+    grid_cell_colors: np.ndarray
+      The grids of the ants (uint8):
+      grid_cell_colors[i_ant, (i_row << grid_bits) | i_clm] is the colour of the cell
+      for the grid location in the grid
+    cells: np.ndarray
+      The cells of the ants in their grids (int64)
+    state_dirs: np.ndarray
+      The state and the direction of each ant: state * 4 + dir_id (int64)
+      The number of the reduced move ids (M) is added for a retired ant
+    move_id_to_color: np.ndarray
+      The colour written to the cell indexed by the trace move id (uint8)
+    move_id_to_state_dir: np.ndarray
+      The state and the direction after the move indexed by the trace move id (int64)
+    move_id_to_cell_delta: np.ndarray
+      The change of the cell of an ant indexed by the trace move id (int64)
+    retired_move_counts: np.ndarray
+      The number of the moves performed before the retirement of each ant (int64)
+      -1 if the ant is not retired
+    trace: np.ndarray
+      The trace move ids indexed by the move index and the ant:
+      The reduced move id (see get_move_ids) (+ M if the ant is retired)
+    move_count: int
+      The number of the moves performed
+  """
+  __slots__ = (
+    'initials',
+    'rule',
+    'grid_bits',
+    'grid_cell_colors',
+    'cells',
+    'state_dirs',
+    'move_id_to_color',
+    'move_id_to_state_dir',
+    'move_id_to_cell_delta',
+    'retired_move_counts',
+    'trace',
+    'move_count')
+
+  def __init__(self, initials, grid_bits=BATCH_GRID_BITS, rule=LANGTONS_ANT_RULE):
+    """
+    Description:
+      Creates a batch with an all-white grid for each ant.
+  
+      The lookup tables of the rule are extended by a copy for the retired ants:
+      The trace move ids of a retired ant (M + the reduced move id)
+      do not modify the cell and do not move the ant.
+
+    Parameters:
+      initials: list[list[]]
+        The initials of the ants (see AntSimulation)
+      grid_bits: int
+        The number of the rows (and columns) of a grid: 2 ^ grid_bits
+      rule: TurmiteRule or str
+        The rule of the ants (see TurmiteRule)
+
+    Raises:
+      ValueError: If the ants would be retired before the 1st move
+        (i.e. the half of the grid does not exceed BATCH_CHECK_INTERVAL + 1 cells)
+    """
+    if not isinstance(rule, TurmiteRule):
+      rule = TurmiteRule(rule)
+    ant_count = len(initials)
+    grid_size = 1 << grid_bits
+    if (grid_size >> 1) <= BATCH_CHECK_INTERVAL + 1:
+      raise ValueError(
+        'The grid of 2 ^ {} rows is too small for the check interval of {} moves'.format(
+          grid_bits, BATCH_CHECK_INTERVAL))
+    move_id_count = rule.move_id_count
+    color_stride = 4 * rule.state_count
+    self.initials = list(initials)
+    self.rule = rule
+    self.grid_bits = grid_bits
+    self.grid_cell_colors = np.zeros((ant_count, grid_size * grid_size), dtype=np.uint8)
+    self.cells = np.full(
+      ant_count, ((grid_size >> 1) << grid_bits) | (grid_size >> 1), dtype=np.int64)
+    self.state_dirs = np.array(
+      [4 * (int(initial[4]) if len(initial) > 4 else 0) + get_dir_id(initial[2], initial[3])
+       for initial in initials],
+      dtype=np.int64)
+    self.move_id_to_color = np.array(
+      rule.move_id_to_color +
+      [move_id // color_stride for move_id in range(move_id_count)],
+      dtype=np.uint8)
+    self.move_id_to_state_dir = np.array(
+      rule.move_id_to_state_dir +
+      [move_id_count + move_id % color_stride for move_id in range(move_id_count)],
+      dtype=np.int64)
+    self.move_id_to_cell_delta = np.zeros(2 * move_id_count, dtype=np.int64)
+    self.move_id_to_cell_delta[:move_id_count] = [
+      (row_delta << grid_bits) + clm_delta
+      for row_delta, clm_delta in zip(rule.move_id_to_row_delta, rule.move_id_to_clm_delta)]
+    self.retired_move_counts = np.full(ant_count, -1, dtype=np.int64)
+    self.trace = np.zeros(
+      (ARRAY_SIZE_MOVE_INDEX, ant_count),
+      dtype=np.min_scalar_type(2 * move_id_count - 1))
+    self.move_count = 0
+
+  def retire_border_ants(self, move_count_max):
+    """
+    Description:
+      Retires the ants which may leave their grids in the next move_count_max moves:
+      The distance of the ant to the border of the grid is less than move_count_max.
+      A retired ant stays at its cell keeping its grid, state and direction
+      (see the lookup tables for the retired ants in __init__).
+
+    Parameters:
+      move_count_max: int
+        The max number of the moves before the next inspection
+
+    Returns:
+      None
+
+    Modifies:
+      state_dirs
+      retired_move_counts
+    """
+    grid_size = 1 << self.grid_bits
+    rows = self.cells >> self.grid_bits
+    clms = self.cells & (grid_size - 1)
+    near_border = (
+      (np.minimum(rows, clms) < move_count_max) |
+      (np.maximum(rows, clms) >= grid_size - move_count_max))
+    retired = near_border & (self.state_dirs < self.rule.move_id_count)
+    self.retired_move_counts[retired] = self.move_count
+    self.state_dirs[retired] += self.rule.move_id_count
+
+  def perform_travel(self, move_index_end):
+    """
+    Description:
+      Performs the moves of the ants from the last move till move_index_end.
+      The ants are moved in lockstep in blocks of BATCH_CHECK_INTERVAL moves
+      and the ants approaching the border of the grid are retired before each block.
+  
+      The trace move id of an ant is:
+        colour * 4 * state_count + state * 4 + dir_id (+ M if retired)
+      Hence, the write, the turn and the move are looked up by the trace move id.
+
+    Parameters:
+      move_index_end: int
+        The index after the last move
+
+    Returns:
+      None
+
+    Modifies:
+      The attributes of the batch
+    """
+    if move_index_end > self.trace.shape[0]:
+      self.trace = grow_array(
+        self.trace, max(move_index_end, 2 * self.trace.shape[0]))
+
+    # Local references for the loop
+    grid_cell_colors = self.grid_cell_colors.reshape(-1)
+    grid_starts = np.arange(self.cells.size, dtype=np.int64) * self.grid_cell_colors.shape[1]
+    color_stride = 4 * self.rule.state_count
+    cells = self.cells
+    colors_next = self.move_id_to_color
+    state_dirs_next = self.move_id_to_state_dir
+    cell_deltas = self.move_id_to_cell_delta
+    trace = self.trace
+
+    while self.move_count < move_index_end:
+      move_index_block_end = min(self.move_count + BATCH_CHECK_INTERVAL, move_index_end)
+      self.retire_border_ants(move_index_block_end - self.move_count + 1)
+      state_dirs = self.state_dirs
+      for move_index in range(self.move_count, move_index_block_end):
+        # Get the trace move ids
+        cell_indices = grid_starts + cells
+        move_ids = np.multiply(
+          grid_cell_colors[cell_indices], color_stride, dtype=np.int64) + state_dirs
+        trace[move_index] = move_ids
+  
+        # Write the cell colours and move the ants
+        grid_cell_colors[cell_indices] = colors_next[move_ids]
+        state_dirs = state_dirs_next[move_ids]
+        cells += cell_deltas[move_ids]
+      self.state_dirs = state_dirs
+      self.move_count = move_index_block_end
+
+  def get_simulation(self, ant_index):
+    """
+    Description:
+      Returns a simulation of an ant loaded by the moves of the batch:
+        The arrays of the simulation are filled by the trace of the ant
+        (till the retirement if the ant is retired).
+        The grid of the simulation is the grid of the ant.
+      Hence, the simulation can run the pattern detection
+      and continue the travel of the ant.
+
+    Parameters:
+      ant_index: int
+        The index of the ant in the batch
+
+    Returns:
+      AntSimulation: The simulation of the ant
+
+    Modifies:
+      None
+    """
+    rule = self.rule
+    simulation = AntSimulation(self.initials[ant_index], rule)
+    move_count = int(self.retired_move_counts[ant_index])
+    if move_count < 0:
+      move_count = self.move_count
+
+    # The full move ids and the black cell counts are the cumulative sums
+    # of the changes of the grid location and the number of the nonzero cells
+    move_ids_reduced = self.trace[:move_count, ant_index].astype(np.int64)
+    location_deltas = np.array(rule.move_id_to_location_delta)[move_ids_reduced]
+    locations = (
+      (simulation.row << MOVE_ID_FULL_ROW_BITS) + simulation.clm +
+      np.cumsum(location_deltas) - location_deltas)
+    black_counts = np.cumsum(np.array(rule.move_id_to_nonzero_delta)[move_ids_reduced])
+    simulation.store_moves(
+      move_ids_reduced, rule.move_id_count * locations + move_ids_reduced, black_counts)
+
+    # Move the ant and copy its grid:
+    # The grid of the ant is centered at the initial location
+    grid_size = 1 << self.grid_bits
+    cell = int(self.cells[ant_index])
+    state_dir = int(self.state_dirs[ant_index]) % rule.move_id_count
+    row_offset = simulation.row - (grid_size >> 1)
+    clm_offset = simulation.clm - (grid_size >> 1)
+    simulation.row = (cell >> self.grid_bits) + row_offset
+    simulation.clm = (cell & (grid_size - 1)) + clm_offset
+    simulation.state = state_dir >> 2
+    simulation.dir_id = state_dir & 3
+    simulation.black_count = int(black_counts[-1]) if move_count else 0
+    grid = self.grid_cell_colors[ant_index]
+    nonzero_cells = np.flatnonzero(grid)
+    for row, clm, color in zip(
+        ((nonzero_cells >> self.grid_bits) + row_offset).tolist(),
+        ((nonzero_cells & (grid_size - 1)) + clm_offset).tolist(),
+        grid[nonzero_cells].tolist()):
+      tile_key = (row >> GRID_TILE_BITS, clm >> GRID_TILE_BITS)
+      tile = simulation.grid_cell_colors.get(tile_key)
+      if tile is None:
+        tile = simulation.grid_cell_colors[tile_key] = bytearray(GRID_TILE_BYTE_COUNT)
+      tile[((row & GRID_TILE_MASK) << GRID_TILE_BITS) | (clm & GRID_TILE_MASK)] = color
+    return simulation
+
+  def solve(
+      self,
+      move_count_req,
+      pattern_detection_method,
+      travel_move_count_limit,
+      pattern_detection_start_move_index,
+      pattern_detection_range,
+      pattern_repeat_count_req):
+    """
+    Description:
+      Performs the travels of the ants in lockstep till the travel limit
+      and determines the black cell count of each ant
+      by the simulation of the ant (see get_simulation and AntSimulation.solve).
+
+    Parameters:
+      See AntSimulation.solve
+
+    Returns:
+      list[tuple]: The output of AntSimulation.solve for each ant
+
+    Modifies:
+      The attributes of the batch
+    """
+    self.perform_travel(travel_move_count_limit)
+    return [
+      self.get_simulation(ant_index).solve(
+        move_count_req,
+        pattern_detection_method,
+        travel_move_count_limit,
+        pattern_detection_start_move_index,
+        pattern_detection_range,
+        pattern_repeat_count_req)
+      for ant_index in range(len(self.initials))]
+
+class TileTransitionCache:
+  """
+  Description:
+    The memoized transitions of an ant through the macro tiles
+    (the squares of 2 ^ MACRO_TILE_BITS cells) for a rule.
+  
+    A transition starts when the ant enters a macro tile (or resumes in it)
+    and ends when the ant leaves the tile
+    (or after MACRO_TRANSITION_MOVE_COUNT_MAX moves, e.g. for an ant cycling in the tile).
+    The transition depends only on the colours of the tile, the cell of the ant
+    in the tile, the state and the direction (the key).
+    Hence, a transition is simulated once (a miss)
+    and the repeated transitions (the hits) skip the moves.
+  
+    The size of the cache is bounded:
+    The least recently used transition is evicted when the cache is full.
+
+  Attributes:
+    rule: TurmiteRule
+      The rule of the ants
+    size_max: int
+      The max number of the transitions stored
+    transitions: collections.OrderedDict
+      The transitions ordered by the last use (the most recent is the last):
+      transitions[(tile, cell, state_dir)] = (
+        tile_next, row_next, clm_next, state_dir_next, move_count, black_count_delta)
+      tile: bytes: The colours of the tile (a byte per cell)
+      cell: int: The cell of the ant in the tile: (i_row << MACRO_TILE_BITS) | i_clm
+      state_dir: int: The state and the direction of the ant: state * 4 + dir_id
+      tile_next: bytes: The colours of the tile after the transition
+      row_next, clm_next: int: The location of the ant relative to the tile after the transition
+      (outside the tile if the ant left the tile)
+      state_dir_next: int: The state and the direction after the transition
+      move_count: int: The number of the moves of the transition
+      black_count_delta: int: The change of the number of the nonzero cells
+    hit_count: int
+      The number of the transitions found in the cache
+    miss_count: int
+      The number of the transitions simulated
+  """
+  __slots__ = (
+    'rule',
+    'size_max',
+    'transitions',
+    'hit_count',
+    'miss_count')
+
+  def __init__(self, rule=LANGTONS_ANT_RULE, size_max=MACRO_CACHE_SIZE_MAX):
+    """
+    Description:
+      Creates an empty cache.
+
+    Parameters:
+      rule: TurmiteRule or str
+        The rule of the ants (see TurmiteRule)
+      size_max: int
+        The max number of the transitions stored
+    """
+    if not isinstance(rule, TurmiteRule):
+      rule = TurmiteRule(rule)
+    self.rule = rule
+    self.size_max = int(size_max)
+    self.transitions = collections.OrderedDict()
+    self.hit_count = 0
+    self.miss_count = 0
+
+  def simulate(self, tile, row, clm, state_dir, move_count_max):
+    """
+    Description:
+      Simulates the moves of the ant in a macro tile
+      until the ant leaves the tile or move_count_max moves are performed.
+
+    Parameters:
+      tile: bytes
+        The colours of the tile (a byte per cell)
+      row: int
+        The row of the ant in the tile
+      clm: int
+        The column of the ant in the tile
+      state_dir: int
+        The state and the direction of the ant: state * 4 + dir_id
+      move_count_max: int
+        The max number of the moves
+
+    Returns:
+      tuple: The transition (see the class docstring)
+
+    Modifies:
+      None
+    """
+    rule = self.rule
+    colors_next = rule.move_id_to_color
+    state_dirs_next = rule.move_id_to_state_dir
+    row_deltas = rule.move_id_to_row_delta
+    clm_deltas = rule.move_id_to_clm_delta
+    black_count_deltas = rule.move_id_to_nonzero_delta
+    color_stride = 4 * rule.state_count
+    tile_bits = MACRO_TILE_BITS
+    cells = bytearray(tile)
+    black_count_delta = 0
+    move_count = 0
+    while move_count < move_count_max and not (row | clm) >> tile_bits:
+      cell = (row << tile_bits) | clm
+      move_id_reduced = cells[cell] * color_stride + state_dir
+      cells[cell] = colors_next[move_id_reduced]
+      black_count_delta += black_count_deltas[move_id_reduced]
+      state_dir = state_dirs_next[move_id_reduced]
+      row += row_deltas[move_id_reduced]
+      clm += clm_deltas[move_id_reduced]
+      move_count += 1
+    return bytes(cells), row, clm, state_dir, move_count, black_count_delta
+
+  def get_transition(self, tile, row, clm, state_dir):
+    """
+    Description:
+      Returns the transition of the ant in a macro tile
+      from the cache (a hit) or by simulating it (a miss).
+
+    Parameters:
+      tile: bytes
+        The colours of the tile (a byte per cell)
+      row: int
+        The row of the ant in the tile
+      clm: int
+        The column of the ant in the tile
+      state_dir: int
+        The state and the direction of the ant: state * 4 + dir_id
+
+    Returns:
+      tuple: The transition (see the class docstring)
+
+    Modifies:
+      transitions
+      hit_count
+      miss_count
+    """
+    key = (tile, (row << MACRO_TILE_BITS) | clm, state_dir)
+    transition = self.transitions.get(key)
+    if transition is not None:
+      self.transitions.move_to_end(key)
+      self.hit_count += 1
+      return transition
+
+    self.miss_count += 1
+    transition = self.simulate(tile, row, clm, state_dir, MACRO_TRANSITION_MOVE_COUNT_MAX)
+    self.transitions[key] = transition
+    if len(self.transitions) > self.size_max:
+      self.transitions.popitem(last=False)
+    return transition
+
+class MacroAntSimulation:
+  """
+  Description:
+    A travel of an ant performed by the macro steps:
+    The ant is moved through a macro tile (a square of 2 ^ MACRO_TILE_BITS cells)
+    by a transition of TileTransitionCache.
+    The moves of a transition are not stored.
+    Hence, the macro steps determine the black cell count at a move count
+    without the pattern detection (e.g. for the rules without a highway).
+  
+    The grid is a dictionary of the macro tiles allocated on demand.
+    The tiles are immutable (bytes) and shared with the cache keys.
+
+  Attributes:
+    cache: TileTransitionCache
+      The transitions of the macro tiles for the rule of the ant
+    grid_cell_colors: dict:
+      The colors of the cells of the grid in the macro tiles:
+      grid_cell_colors[(i_row >> MACRO_TILE_BITS, i_clm >> MACRO_TILE_BITS)]: bytes:
+      The byte (i_row & MACRO_TILE_MASK) << MACRO_TILE_BITS | (i_clm & MACRO_TILE_MASK)
+      of the tile is the colour of the cell
+    row: int
+      The grid location of the ant in x-direction
+    clm: int
+      The grid location of the ant in y-direction
+    state: int
+      The state of the ant (see TurmiteRule)
+    dir_id: int
+      The direction of the ant: 0 (N), 1 (E), 2 (W) or 3 (S)
+    black_count: int
+      The number of the black (nonzero colour) cells
+    move_count: int
+      The number of the moves performed
+  """
+  __slots__ = (
+    'cache',
+    'grid_cell_colors',
+    'row',
+    'clm',
+    'state',
+    'dir_id',
+    'black_count',
+    'move_count')
+
+  def __init__(self, initials, cache=None):
+    """
+    Description:
+      Creates a simulation with an all-white grid.
+
+    Parameters:
+      initials: list[]
+        The initials of the ant (see AntSimulation)
+      cache: TileTransitionCache
+        The transitions shared by the simulations of a rule
+        (the rule of the ant is the rule of the cache)
+        A new cache for Langton's ant by default
+    """
+    if cache is None:
+      cache = TileTransitionCache()
+    self.cache = cache
+    self.grid_cell_colors = {}
+    self.row = int(initials[0])
+    self.clm = int(initials[1])
+    self.state = int(initials[4]) if len(initials) > 4 else 0
+    self.dir_id = get_dir_id(initials[2], initials[3])
+    self.black_count = 0
+    self.move_count = 0
+
+  def get_cell_color(self, row, clm):
+    """
+    Description:
+      Returns the colour of a cell of the grid.
+      The cells in the tiles not allocated yet are white (0).
+
+    Parameters:
+      row: int
+        The grid location in x-direction
+      clm: int
+        The grid location in y-direction
+
+    Returns:
+      int: The colour of the cell
+
+    Modifies:
+      None
+    """
+    tile = self.grid_cell_colors.get((row >> MACRO_TILE_BITS, clm >> MACRO_TILE_BITS))
+    if tile is None:
+      return 0
+    return tile[((row & MACRO_TILE_MASK) << MACRO_TILE_BITS) | (clm & MACRO_TILE_MASK)]
+
+  def perform_travel(self, move_index_end):
+    """
+    Description:
+      Performs the moves of the ant from the last move till move_index_end
+      by the macro steps.
+      The last transition is simulated without the cache
+      if it exceeds the requested moves.
+
+    Parameters:
+      move_index_end: int
+        The index after the last move (a python int of any size)
+
+    Returns:
+      None
+
+    Modifies:
+      The attributes of the simulation
+      The cache
+    """
+    # Local references for the loop
+    cache = self.cache
+    get_transition = cache.get_transition
+    tiles = self.grid_cell_colors
+    tile_bits = MACRO_TILE_BITS
+    tile_mask = MACRO_TILE_MASK
+    tile_empty = bytes(MACRO_TILE_BYTE_COUNT)
+    row = self.row
+    clm = self.clm
+    state_dir = 4 * self.state + self.dir_id
+    black_count = self.black_count
+    move_count = self.move_count
+
+    while move_count < move_index_end:
+      tile_key = (row >> tile_bits, clm >> tile_bits)
+      tile = tiles.get(tile_key, tile_empty)
+      tile_row = row & tile_mask
+      tile_clm = clm & tile_mask
+      transition = get_transition(tile, tile_row, tile_clm, state_dir)
+      if move_count + transition[4] > move_index_end:
+        transition = cache.simulate(
+          tile, tile_row, tile_clm, state_dir, move_index_end - move_count)
+      tile_next, row_next, clm_next, state_dir, transition_move_count, black_count_delta = (
+        transition)
+  
+      tiles[tile_key] = tile_next
+      row += row_next - tile_row
+      clm += clm_next - tile_clm
+      black_count += black_count_delta
+      move_count += transition_move_count
+
+    self.row = row
+    self.clm = clm
+    self.state = state_dir >> 2
+    self.dir_id = state_dir & 3
+    self.black_count = black_count
+    self.move_count = move_count
 
 import time
 
-def main():
+def main(pattern_detection_method='online'):
   """
   Description:
     The main function
@@ -731,16 +2406,17 @@ def main():
     See the module docstring
   
   Parameters:
-    None
+    pattern_detection_method: str
+      See AntSimulation.solve
   
   Returns:
-    np.uint64: The total number of the black cells for the whole travel of the ant
+    int: The total number of the black cells for the whole travel of the ant
   """
   t0 = time.time()
   
   # Initialize the ant.
-  initial_row = np.uint16(ARRAY_SIZE_GRID / 2)
-  initial_clm = np.uint16(ARRAY_SIZE_GRID / 2)
+  initial_row = 0
+  initial_clm = 0
   initial_dir_x = np.int8(0)
   initial_dir_y = np.int8(-1)
   
@@ -749,21 +2425,23 @@ def main():
   
   # Set a limit value for the move count in order to prevent an infinite loop
   # in case of a failure in the pattern detection procedure.
-  travel_move_count_limit = np.uint16(30000)
+  travel_move_count_limit = 30000
   
   # This variable is used to delay the start of the pattern detection procedure.
-  pattern_detection_start_move_index = np.uint16(10000)
+  pattern_detection_start_move_index = 10000
   
   # The required number of repeats for a pattern to be accepted
-  pattern_repeat_count_req = np.uint8(10)
+  pattern_repeat_count_req = 10
   
   # Perform pattern detection after pattern_detection_start_move_index
   # in every pattern_detection_range moves.
   pattern_detection_range = 100
   
-  # Perform the limited travel and get the pattern move indices
-  move_index_pattern_start, move_index_pattern_end = perform_limited_travel(
-    [initial_row, initial_clm, initial_dir_x, initial_dir_y],
+  # Perform the limited travel and determine the black cell count
+  simulation = AntSimulation([initial_row, initial_clm, initial_dir_x, initial_dir_y])
+  black_count, _, _ = simulation.solve(
+    move_count_req,
+    pattern_detection_method,
     travel_move_count_limit,
     pattern_detection_start_move_index,
     pattern_detection_range,
@@ -771,16 +2449,7 @@ def main():
   
   t1 = time.time()
   print(t1 - t0)
-  
-  # The pattern detection has failed
-  if move_index_pattern_start is None:
-    return None
-  
-  # Determine the total number of the black cells for the whole travel of the ant
-  return determine_black_count(
-    move_count_req,
-    move_index_pattern_start,
-    move_index_pattern_end)
+  return black_count
 
 if __name__ == '__main__':
   print ("Langton's ant problem:")
@@ -0,0 +1,384 @@
+# -*- coding: utf-8 -*-
+"""
+Parameter sweep for the pattern detection of the ProjectEuler problem 349 (PE_P349_LangtonsAnt).
+
+Description:
+  The result of the delayed pattern detection depends on the constants
+  P1, w and n (see the CAUTION section of PE_P349_LangtonsAnt)
+  as the fake patterns of the arbitrary region may be accepted.
+
+  Runs a simulation (AntSimulation) for each combination of
+  the pattern detection method, P1, w, n and the start direction of the ant
+  and reports the following for each run:
+    The result (the black cell count and the pattern move indices),
+    The wall time,
+    The agreement of the result with the reference result of the start direction.
+
+  The reference result of a start direction is determined independently
+  of the agreement with the swept methods:
+  The pattern found by the online pattern detection (with the max n of the sweep
+  and a large travel limit) is accepted as the reference only if
+  the black cell counts determined by the pattern (see PE_P349_LangtonsAnt.HighwayPattern)
+  equal the simulated black cell counts for every move of a long travel
+  (REFERENCE_VERIFICATION_MOVE_COUNT moves, i.e. about 100 times the arbitrary region).
+  Hence, a fake pattern accepted by the detection cannot be the reference.
+
+  The runs are distributed to a process pool (spawned, not forked).
+  Each run creates its own simulation.
+  Hence, the runs do not share any state.
+
+  The results are written as JSON.
+  The fastest agreeing combination of each method is reported
+  in order to tune the constants of the main routine.
+
+Usage:
+  python PE_P349_LangtonsAnt_sweep.py --output sweep.json
+  python PE_P349_LangtonsAnt_sweep.py --starts 1 10000 --ranges 1 100 --repeats 10 100
+  python PE_P349_LangtonsAnt_sweep.py --methods delayed autocorrelation --directions N S
+
+@author: baris.albayrak.ieee@gmail.com
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+import PE_P349_LangtonsAnt as langton
+
+# The move count requirement by Project Euler Problem #349
+MOVE_COUNT_REQ = 10 ** 18
+
+# The default sweep (see the Nomenclature section of PE_P349_LangtonsAnt)
+PATTERN_DETECTION_METHODS = ['online', 'autocorrelation', 'delayed']
+PATTERN_DETECTION_START_MOVE_INDICES = [1, 1000, 5000, 10000]  # P1
+PATTERN_DETECTION_RANGES = [1, 10, 100]  # w
+PATTERN_REPEAT_COUNT_REQS = [10, 20]  # n
+TRAVEL_MOVE_COUNT_LIMIT = 30000  # P2
+
+# The travel limit of the reference runs
+# and the number of the moves for which the reference pattern is verified
+REFERENCE_TRAVEL_MOVE_COUNT_LIMIT = 1 << 20
+REFERENCE_VERIFICATION_MOVE_COUNT = 1 << 20
+
+# The initial orientations (X-direction, Y-direction) of the ant
+DIRECTIONS = {
+  'N': (np.int8(0), np.int8(1)),
+  'E': (np.int8(1), np.int8(0)),
+  'W': (np.int8(-1), np.int8(0)),
+  'S': (np.int8(0), np.int8(-1))}
+
+def run_sweep_task(task):
+  '''
+  Description:
+    Run a simulation for a combination of the sweep in the current process.
+
+  Parameters:
+    task : dict:
+      The combination: method, P1, w, n, direction and the travel limit
+      (P1 and w are None if the method does not use them)
+      and optionally the number of the moves to verify the pattern for
+      (verify, see verify_highway)
+
+  Outputs:
+    dict: The combination extended by the measurements of the run
+  '''
+  result = dict(task)
+  try:
+    dir_x, dir_y = DIRECTIONS[task['direction']]
+    t0 = time.perf_counter()
+    simulation = langton.AntSimulation([0, 0, dir_x, dir_y])
+    black_count, move_index_pattern_start, move_index_pattern_end = simulation.solve(
+      np.uint64(MOVE_COUNT_REQ),
+      task['method'],
+      task['limit'],
+      task['P1'],
+      task['w'],
+      task['n'])
+    t1 = time.perf_counter()
+  except Exception as error: # Reported to the parent
+    result['error'] = repr(error)
+    return result
+
+  result.update({
+    'black_count': None if black_count is None else int(black_count),
+    'pattern_start': move_index_pattern_start,
+    'pattern_end': move_index_pattern_end,
+    'move_count': simulation.move_count,
+    'wall_time': t1 - t0})
+  if task.get('verify'):
+    result['verified'] = black_count is not None and verify_highway(
+      simulation, move_index_pattern_start, move_index_pattern_end, task['verify'])
+  return result
+
+def verify_highway(simulation, move_index_pattern_start, move_index_pattern_end, move_count):
+  '''
+  Description:
+    Verify a detected pattern for a long travel:
+    The black cell counts determined by the pattern (HighwayPattern)
+    must equal the simulated black cell counts after each move of the travel.
+
+  Parameters:
+    simulation : PE_P349_LangtonsAnt.AntSimulation:
+      The simulation which has detected the pattern
+    move_index_pattern_start : int:
+      The move index where the pattern starts formation
+    move_index_pattern_end : int:
+      The move index where the pattern ends
+    move_count : int:
+      The number of the moves of the travel
+
+  Outputs:
+    bool: True if the pattern holds for the whole travel
+  '''
+  simulation.perform_travel_chunk(move_count)
+  highway = simulation.get_highway(move_index_pattern_start, move_index_pattern_end)
+  return bool(np.array_equal(
+    highway.get_black_count(np.arange(1, move_count + 1)),
+    simulation.move_index_to_black_count[:move_count]))
+
+def get_sweep_tasks(methods, starts, ranges, repeats, directions, limit):
+  '''
+  Description:
+    Get the combinations of the sweep.
+    Only the parameters used by a method are swept for the method
+    (the others are None):
+      online: n
+      autocorrelation: w, n
+      delayed: P1, w, n
+
+  Parameters:
+    methods : list[str]:
+      The pattern detection methods (see AntSimulation.solve)
+    starts : list[int]:
+      The values of P1
+    ranges : list[int]:
+      The values of w
+    repeats : list[int]:
+      The values of n
+    directions : list[str]:
+      The start directions of the ant (see DIRECTIONS)
+    limit : int:
+      The travel limit (P2)
+
+  Outputs:
+    list[dict]: The combinations
+  '''
+  tasks = []
+  for method in methods:
+    method_starts = starts if method == 'delayed' else [None]
+    method_ranges = [None] if method == 'online' else ranges
+    for direction in directions:
+      for P1 in method_starts:
+        for w in method_ranges:
+          for n in repeats:
+            tasks.append({
+              'method': method,
+              'P1': P1,
+              'w': w,
+              'n': n,
+              'direction': direction,
+              'limit': limit})
+  return tasks
+
+def run_sweep(tasks, reference_tasks, process_count):
+  '''
+  Description:
+    Run the reference combinations and the combinations of the sweep
+    in a process pool and check the agreement of the results.
+
+  Parameters:
+    tasks : list[dict]:
+      The combinations of the sweep
+    reference_tasks : list[dict]:
+      The reference combination for each start direction
+      (verified for a long travel, see verify_highway)
+    process_count : int:
+      The number of the processes (None for the cpu count)
+
+  Outputs:
+    references : dict:
+      The black cell count of the reference run for each start direction:
+        None if the reference pattern fails or is not verified
+    results : list[dict]:
+      The measurements of the runs in the order of the input combinations
+  '''
+  context = multiprocessing.get_context('spawn')
+  with context.Pool(process_count) as pool:
+    references = {}
+    for result in pool.map(run_sweep_task, reference_tasks):
+      print('reference ' + format_result(result), flush=True)
+      references[result['direction']] = (
+        result['black_count'] if result.get('verified') else None)
+
+    results = [None] * len(tasks)
+    for task_index, result in pool.imap_unordered(
+        run_indexed_sweep_task, list(enumerate(tasks))):
+      reference = references.get(result['direction'])
+      result['agrees'] = (
+        'error' not in result and
+        reference is not None and
+        result['black_count'] == reference)
+      results[task_index] = result
+      print(format_result(result), flush=True)
+
+  return references, results
+
+def run_indexed_sweep_task(indexed_task):
+  '''
+  Description:
+    Run a combination of the sweep keeping its index
+    as the results of the pool are not ordered.
+
+  Parameters:
+    indexed_task : tuple(int, dict):
+      The index and the combination
+
+  Outputs:
+    tuple(int, dict): The index and the measurements of the run
+  '''
+  task_index, task = indexed_task
+  return task_index, run_sweep_task(task)
+
+def format_result(result):
+  '''
+  Description:
+    Format the measurements of a run as a single line.
+
+  Parameters:
+    result : dict:
+      The measurements of a run
+
+  Outputs:
+    str: The formatted line
+  '''
+  prefix = '{:<15} P1={:<6} w={:<4} n={:<4} dir={}: '.format(
+    result['method'],
+    '-' if result['P1'] is None else result['P1'],
+    '-' if result['w'] is None else result['w'],
+    result['n'],
+    result['direction'])
+  if 'error' in result:
+    return prefix + 'ERROR ' + result['error']
+
+  line = prefix + 'black_count={} pattern=[{}, {}] time={:.3f}s'.format(
+    result['black_count'],
+    result['pattern_start'],
+    result['pattern_end'],
+    result['wall_time'])
+  if 'verified' in result:
+    line += ' verified' if result['verified'] else ' NOT VERIFIED'
+  if 'agrees' in result:
+    line += ' agrees' if result['agrees'] else ' DISAGREES'
+  return line
+
+def get_fastest_agreeing(results):
+  '''
+  Description:
+    Get the fastest run of each method agreeing with the reference
+    for all start directions of the sweep.
+
+  Parameters:
+    results : list[dict]:
+      The measurements of the runs
+
+  Outputs:
+    dict: The parameters (P1, w, n) and the max wall time
+    over the start directions for each method
+  '''
+  combinations = {}
+  for result in results:
+    key = (result['method'], result['P1'], result['w'], result['n'])
+    agrees, wall_time = combinations.get(key, (True, 0.))
+    combinations[key] = (
+      agrees and result['agrees'],
+      max(wall_time, result.get('wall_time', 0.)))
+
+  fastest = {}
+  for (method, P1, w, n), (agrees, wall_time) in combinations.items():
+    if agrees and (method not in fastest or wall_time < fastest[method]['wall_time']):
+      fastest[method] = {'P1': P1, 'w': w, 'n': n, 'wall_time': wall_time}
+  return fastest
+
+def main():
+  '''
+  Description:
+    The main function
+
+  Parameters:
+    None (see the command line arguments)
+
+  Returns:
+    int: The exit code: 1 if the reference runs fail, are not verified or disagree, 0 otherwise
+  '''
+  parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+  parser.add_argument(
+    '--methods', nargs='+', default=PATTERN_DETECTION_METHODS,
+    choices=PATTERN_DETECTION_METHODS,
+    help='The pattern detection methods')
+  parser.add_argument(
+    '--starts', nargs='+', type=int, default=PATTERN_DETECTION_START_MOVE_INDICES,
+    help='The move indices delaying the pattern detection (P1)')
+  parser.add_argument(
+    '--ranges', nargs='+', type=int, default=PATTERN_DETECTION_RANGES,
+    help='The move counts between the pattern detections (w)')
+  parser.add_argument(
+    '--repeats', nargs='+', type=int, default=PATTERN_REPEAT_COUNT_REQS,
+    help='The required numbers of repeats for a pattern to be accepted (n)')
+  parser.add_argument(
+    '--directions', nargs='+', default=list(DIRECTIONS), choices=list(DIRECTIONS),
+    help='The start directions of the ant')
+  parser.add_argument(
+    '--limit', type=int, default=TRAVEL_MOVE_COUNT_LIMIT,
+    help='The travel limit (P2)')
+  parser.add_argument(
+    '--processes', type=int,
+    help='The number of the processes (the cpu count by default)')
+  parser.add_argument(
+    '--output', help='The path of the JSON output')
+  args = parser.parse_args()
+
+  tasks = get_sweep_tasks(
+    args.methods, args.starts, args.ranges, args.repeats, args.directions, args.limit)
+  reference_tasks = get_sweep_tasks(
+    ['online'], [None], [None], [max(args.repeats)], args.directions,
+    REFERENCE_TRAVEL_MOVE_COUNT_LIMIT)
+  for reference_task in reference_tasks:
+    reference_task['verify'] = REFERENCE_VERIFICATION_MOVE_COUNT
+  references, results = run_sweep(tasks, reference_tasks, args.processes)
+
+  fastest = get_fastest_agreeing(results)
+  for method, parameters in fastest.items():
+    print('fastest agreeing {}: P1={} w={} n={} time={:.3f}s'.format(
+      method,
+      parameters['P1'],
+      parameters['w'],
+      parameters['n'],
+      parameters['wall_time']))
+  disagreement_count = sum(not result['agrees'] for result in results)
+  print('{} of {} runs disagree with the reference'.format(
+    disagreement_count, len(results)))
+
+  if args.output:
+    report = {
+      'python': platform.python_version(),
+      'numpy': np.__version__,
+      'machine': platform.machine(),
+      'cpu_count': os.cpu_count(),
+      'references': references,
+      'fastest': fastest,
+      'results': results}
+    with open(args.output, 'w') as output_file:
+      json.dump(report, output_file, indent=2)
+
+  # The start directions rotate the travel: the black cell count must be the same
+  reference_black_counts = set(references.values())
+  return 1 if None in reference_black_counts or len(reference_black_counts) > 1 else 0
+
+if __name__ == '__main__':
+  sys.exit(main())